@@ -0,0 +1,88 @@
+import random
+
+WORDS = (
+    "ring hobbit wizard shire elf dwarf mountain river forest road tower king "
+    "sword song star ship gate bridge fire shadow light council quest"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def inline_text(rng: random.Random, words: int = 40) -> str:
+    parts = []
+    for _ in range(words // 8):
+        parts.append(sentence(rng, 6))
+        parts.append(rng.choice([
+            f"**{rng.choice(WORDS)}**",
+            f"_{rng.choice(WORDS)}_",
+            f"`{rng.choice(WORDS)}()`",
+            f"[{rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})",
+        ]))
+    return " ".join(parts)
+
+
+def small_page(rng: random.Random, idx: int) -> str:
+    blocks = [f"# Page {idx}"]
+    for _ in range(4):
+        blocks.append(inline_text(rng))
+    blocks.append("\n".join(f"- {sentence(rng, 5)}" for _ in range(5)))
+    blocks.append(f"> {sentence(rng)}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def huge_page(rng: random.Random, sections: int = 400) -> str:
+    blocks = ["# Reference"]
+    for idx in range(sections):
+        blocks.append(f"## Section {idx}")
+        blocks.append(inline_text(rng, 80))
+        blocks.append("\n".join(f"{n}. {sentence(rng, 6)}" for n in range(1, 9)))
+        blocks.append(code_block(rng, 6))
+    return "\n\n".join(blocks) + "\n"
+
+
+def link_heavy_page(rng: random.Random, paragraphs: int = 50, links: int = 60) -> str:
+    blocks = ["# Links"]
+    for _ in range(paragraphs):
+        blocks.append(" ".join(
+            f"[{rng.choice(WORDS)}](https://example.com/{rng.choice(WORDS)}) and ![{rng.choice(WORDS)}](/images/{idx}.png)"
+            for idx in range(links)
+        ))
+    return "\n\n".join(blocks) + "\n"
+
+
+def nested_list_page(rng: random.Random, lists: int = 100, depth: int = 6) -> str:
+    blocks = ["# Lists"]
+    for _ in range(lists):
+        lines = []
+        for level in range(depth):
+            for _ in range(3):
+                lines.append(f"{'  ' * level}- {inline_text(rng, 8)}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
+def code_block(rng: random.Random, lines: int = 200) -> str:
+    body = "\n".join(f"    {rng.choice(WORDS)} = {rng.choice(WORDS)}({idx}) # {sentence(rng, 4)}" for idx in range(lines))
+    return f"```\n{body}\n```"
+
+
+def code_heavy_page(rng: random.Random, blocks: int = 20, lines: int = 200) -> str:
+    parts = ["# Code"]
+    for _ in range(blocks):
+        parts.append(sentence(rng))
+        parts.append(code_block(rng, lines))
+    return "\n\n".join(parts) + "\n"
+
+
+def corpora(seed: int = 1, scale: float = 1.0) -> dict[str, list[str]]:
+    # name -> list of page sources
+    rng = random.Random(seed)
+    return {
+        "many_small_pages": [small_page(rng, idx) for idx in range(max(1, int(500 * scale)))],
+        "huge_page": [huge_page(rng, max(1, int(400 * scale)))],
+        "link_heavy": [link_heavy_page(rng, max(1, int(50 * scale)))],
+        "nested_lists": [nested_list_page(rng, max(1, int(100 * scale)))],
+        "code_blocks": [code_heavy_page(rng, max(1, int(20 * scale)))],
+    }
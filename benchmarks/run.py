@@ -0,0 +1,173 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import corpora
+from block_functions import block_to_block_type, markdown_to_blocks
+from blocktype import BlockType
+from builder import BuildOptions, build_site
+from inline_functions import extract_markdown_images, extract_markdown_links, text_to_textnodes
+from MDtoHTML import code_text, markdown_to_html, markdown_to_html_node, process_list_items
+from template import Template
+from writer import write_output
+import main as site_main
+
+with open(os.path.join(ROOT, "template.html"), "r") as template_file:
+    TEMPLATE = template_file.read()
+# benchmark names are "{corpus}/{stage}" and "build/{build}"
+STAGES = ("markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "list_items", "code_text", "extract_links",
+          "markdown_to_html", "markdown_to_html_node", "to_html", "template_fill", "file_write")
+BUILDS = ("full_serial", "full_parallel", "incremental_noop")
+
+
+def measure(func, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return {"min": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def stage_benchmarks(name: str, pages: list[str], repeat: int, tmp: str, selected: str = "") -> dict:
+    blocks = [block for page in pages for block in markdown_to_blocks(page)]
+    paragraphs = [block for block in blocks if not block.startswith("```")]
+    list_blocks = [block for block in blocks if block_to_block_type(block) in (BlockType.ORDERED_LIST, BlockType.UNORDERED_LIST)]
+    code_blocks = [block for block in blocks if block_to_block_type(block) == BlockType.CODE]
+    trees = [markdown_to_html_node(page) for page in pages]
+    bodies = [tree.to_html() for tree in trees]
+    template = Template(TEMPLATE, "/site/")
+    out_path = os.path.join(tmp, "out.html")
+
+    def write_pages():
+        for body in bodies:
+            write_output(out_path, [body])
+
+    benchmarks = {
+        f"{name}/markdown_to_blocks": lambda: [markdown_to_blocks(page) for page in pages],
+        f"{name}/block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        f"{name}/text_to_textnodes": lambda: [text_to_textnodes(block) for block in paragraphs],
+        f"{name}/list_items": lambda: [process_list_items(block) for block in list_blocks],
+        f"{name}/code_text": lambda: [code_text(block) for block in code_blocks],
+        f"{name}/extract_links": lambda: [(extract_markdown_links(block), extract_markdown_images(block)) for block in paragraphs],
+        f"{name}/markdown_to_html": lambda: [markdown_to_html(page) for page in pages],
+        f"{name}/markdown_to_html_node": lambda: [markdown_to_html_node(page) for page in pages],
+        f"{name}/to_html": lambda: [tree.to_html() for tree in trees],
+        f"{name}/template_fill": lambda: [template.render({"Title": "t", "Content": body}) for body in bodies],
+        f"{name}/file_write": write_pages,
+    }
+    return {bench: measure(func, repeat) for bench, func in benchmarks.items() if selected in bench}
+
+
+def build_site_tree(root: str, pages: list[str]):
+    for idx, page in enumerate(pages):
+        page_dir = os.path.join(root, "content", f"page{idx}")
+        os.makedirs(page_dir)
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(page)
+    os.makedirs(os.path.join(root, "static", "images"))
+    with open(os.path.join(root, "static", "index.css"), "w") as f:
+        f.write("body { margin: 0 }\n" * 200)
+    for idx in range(50):
+        with open(os.path.join(root, "static", "images", f"{idx}.png"), "wb") as f:
+            f.write(os.urandom(64 * 1024))
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+
+
+def run_build(options: BuildOptions):
+    # build_site rather than main(), which prints build errors instead of raising them, so a broken
+    # build fails the benchmark instead of being timed as a fast one
+    with contextlib.redirect_stdout(io.StringIO()):
+        build_site(site_main.CONTENT_DIR, site_main.STATIC_DIR, site_main.PUBLIC_DIR, site_main.TEMPLATE_PATH,
+                   "/site/", options)
+
+
+def build_benchmarks(pages: list[str], repeat: int, tmp: str, selected: str = "") -> dict:
+    root = os.path.join(tmp, "site")
+    build_site_tree(root, pages)
+    cwd = os.getcwd()
+    os.chdir(root)
+    results = {}
+    try:
+        if selected in "build/full_serial":
+            results["build/full_serial"] = measure(lambda: run_build(BuildOptions(jobs=1)), repeat)
+        if selected in "build/full_parallel":
+            results["build/full_parallel"] = measure(lambda: run_build(BuildOptions()), repeat)
+        if selected in "build/incremental_noop":
+            run_build(BuildOptions(incremental=True))
+            results["build/incremental_noop"] = measure(lambda: run_build(BuildOptions(incremental=True)), repeat)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: dict, baseline: dict):
+    print(f"{'benchmark':45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        change = (current["min"] - old["min"]) / old["min"] * 100 if old["min"] else 0.0
+        print(f"{name:45} {old['min'] * 1000:9.2f}ms {current['min'] * 1000:9.2f}ms {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parser, renderer and full builds")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark; the minimum is reported")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the synthetic corpus sizes")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name (corpus/stage or build/kind) contains this text")
+    parser.add_argument("--no-build", action="store_true", help="skip the end-to-end site builds")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="compare against a results file written by --json")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = corpora(scale=args.scale)
+        for name, pages in corpus.items():
+            # the corpus is only prepared when one of its benchmarks is selected
+            if not any(args.filter in f"{name}/{stage}" for stage in STAGES):
+                continue
+            results.update(stage_benchmarks(name, pages, args.repeat, tmp, args.filter))
+        if not args.no_build and any(args.filter in f"build/{build}" for build in BUILDS):
+            results.update(build_benchmarks(corpus["many_small_pages"], args.repeat, tmp, args.filter))
+
+    for name, result in results.items():
+        print(f"{name:45} min {result['min'] * 1000:9.2f}ms  median {result['median'] * 1000:9.2f}ms")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f)["results"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=1)
+
+if __name__ == "__main__":
+    main()
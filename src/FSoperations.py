@@ -1,36 +1,112 @@
+import errno
 import os
 import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
+from manifest import hash_file
 
-def copy_files(src: str, dst: str):
+
+# files handed to one copy task; batching keeps executor overhead low for trees of small assets
+COPY_BATCH_FILES = 64
+COPY_BATCH_BYTES = 8 * 1024 * 1024
+
+
+class CopyStats():
+    def __init__(self, files: int = 0, bytes: int = 0, seconds: float = 0.0):
+        self.files = files
+        self.bytes = bytes
+        self.seconds = seconds
+
+    def throughput(self) -> float:
+        # bytes per second
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes / self.seconds
+
+    def __repr__(self):
+        return f"CopyStats({self.files} files, {self.bytes} bytes, {self.seconds:.3f}s)"
+
+    def summary(self) -> str:
+        return (f"Copied {self.files} files ({self.bytes / 1e6:.1f} MB) in {self.seconds:.2f}s "
+                f"({self.throughput() / 1e6:.1f} MB/s)")
+
+
+def copy_files(src: str, dst: str, workers: int = None, link: bool = False, skip: tuple[str, ...] = ()) -> CopyStats:
+    # files ending in one of the skip suffixes are left for a later stage to write
     
-    if dir == None:
+    if dst == None:
         return None
     if src == None:
         return None
-    try:
-        cwd = Path.cwd()
-        src_full_path = os.path.join(cwd, src)
-        dst_full_path = os.path.join(cwd, dst)
-        
-        if not os.path.exists(dst_full_path):
-            os.mkdir(dst_full_path)
-        
-        dir_items = os.listdir(src_full_path)
-        for item in dir_items:
-            file_path = os.path.join(src_full_path, item)
-            if os.path.isdir(file_path):
-                dst_file_path = os.path.join(dst_full_path, item)
-                os.mkdir(dst_file_path)
-                copy_files(f"{src}/{item}", f"{dst}/{item}")
-                # print(f"CREATED DIRECTORY: {dst_full_path}/{item}")
-            elif os.path.isfile(file_path):
-                shutil.copy(f"{file_path}", f"{dst_full_path}")
-                # print(f"COPIED FILE: {file_path} -> {src_full_path}")
-    except (OSError, IOError) as e:
-        print(f"Error copying file from {src_full_path} to {dst_file_path} {e}")
-        raise
+    cwd = Path.cwd()
+    src_full_path = os.path.join(cwd, src)
+    dst_full_path = os.path.join(cwd, dst)
+    os.makedirs(dst_full_path, exist_ok=True)
+
+    def copies():
+        for rel_path, entry in scan_files(src_full_path, dst_full_path):
+            if rel_path.endswith(skip):
+                continue
+            yield entry.path, os.path.join(dst_full_path, rel_path), entry.stat().st_size
+
+    return copy_in_pool(copies(), workers, link)
+
+def scan_files(src: str, dst: str = None):
+    # yields (relative path, DirEntry) for every file below src using os.scandir, so file type
+    # checks come from the cached directory entries; mirrors each directory under dst when given
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(src, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir():
+                    if dst is not None:
+                        os.makedirs(os.path.join(dst, rel_path), exist_ok=True)
+                    stack.append(rel_path)
+                elif entry.is_file():
+                    yield rel_path, entry
+
+def copy_in_pool(copies, workers: int = None, link: bool = False) -> CopyStats:
+    # copies is an iterable of (source file, destination file, size); files are grouped into
+    # batches and copied by a thread pool while the iterable is still being produced
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    stats = CopyStats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        limit = workers * 4
+        batch = []
+        batch_bytes = 0
+        for src_file, dst_file, size in copies:
+            batch.append((src_file, dst_file))
+            batch_bytes += size
+            stats.files += 1
+            stats.bytes += size
+            if len(batch) >= COPY_BATCH_FILES or batch_bytes >= COPY_BATCH_BYTES:
+                pending.add(pool.submit(copy_batch, batch, link))
+                batch = []
+                batch_bytes = 0
+                if len(pending) >= limit:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+        if batch:
+            pending.add(pool.submit(copy_batch, batch, link))
+        for future in pending:
+            future.result()
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+def copy_batch(batch: list[tuple[str, str]], link: bool = False):
+    for src_file, dst_file in batch:
+        try:
+            copy_file(src_file, dst_file, link)
+        except (OSError, IOError) as e:
+            print(f"Error copying file from {src_file} to {dst_file} {e}")
+            raise
 
 def delete_files(dir: str = None):
     if dir == None:
@@ -54,4 +130,100 @@ def delete_files(dir: str = None):
                 # print(f"DELETED FILE: {file_path}")
     except (OSError, IOError) as e:
         print(f"Error deleting file {file_path} {e}")
-        raise
\ No newline at end of file
+        raise
+
+def list_files(dir: str) -> list[str]:
+    # every regular file below dir, as paths relative to it
+    return sorted(rel_path for rel_path, _ in scan_files(dir))
+
+def remove_files(root: str, rel_paths) -> None:
+    # removes the given root-relative files and prunes directories they leave empty
+    for rel_path in rel_paths:
+        file_path = os.path.join(root, rel_path)
+        try:
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            parent = os.path.dirname(file_path)
+            while os.path.abspath(parent) != os.path.abspath(root) and not os.listdir(parent):
+                os.rmdir(parent)
+                parent = os.path.dirname(parent)
+        except FileNotFoundError:
+            continue
+        except (OSError, IOError) as e:
+            print(f"Error deleting file {file_path} {e}")
+            raise
+
+
+def copy_file(src_file: str, dst_file: str, link: bool = False) -> None:
+    # hardlinks when asked and possible, otherwise an in-kernel copy; the source mtime is kept
+    # either way so later syncs can compare size and mtime
+    if link:
+        tmp_file = f"{dst_file}.{os.getpid()}.link"
+        try:
+            os.link(src_file, tmp_file)
+            os.replace(tmp_file, dst_file)
+            return
+        except OSError:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    if os.path.exists(dst_file) and os.stat(dst_file).st_nlink > 1:
+        # never write through a hardlink left by an earlier linked sync
+        os.remove(dst_file)
+    if not copy_file_range(src_file, dst_file):
+        shutil.copyfile(src_file, dst_file)  # uses sendfile on Linux
+    shutil.copystat(src_file, dst_file)
+
+def copy_file_range(src_file: str, dst_file: str) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    with open(src_file, "rb") as src, open(dst_file, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError as e:
+            if e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+                return False
+            raise
+    return remaining == 0
+
+def is_synced(src_file: str, dst_file: str, checksum: bool = False) -> bool:
+    try:
+        src_stat = os.stat(src_file)
+        dst_stat = os.stat(dst_file)
+    except FileNotFoundError:
+        return False
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_ino == dst_stat.st_ino and src_stat.st_dev == dst_stat.st_dev:
+        return True
+    if checksum:
+        return hash_file(src_file) == hash_file(dst_file)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+def sync_files(src: str, dst: str, previous=(), checksum: bool = False, link: bool = False, workers: int = None, skip: tuple[str, ...] = ()) -> tuple[list[str], CopyStats, list[str]]:
+    # copies only new or modified files from src into dst and removes the previously
+    # synced files (relative paths in previous) that no longer exist in src; files ending in
+    # one of the skip suffixes are listed but left for a later stage to write.
+    # Returns (files in src, stats for the copied files, removed files)
+    files = []
+    os.makedirs(dst, exist_ok=True)
+
+    def copies():
+        for rel_path, entry in scan_files(src, dst):
+            files.append(rel_path)
+            if rel_path.endswith(skip):
+                continue
+            dst_file = os.path.join(dst, rel_path)
+            if is_synced(entry.path, dst_file, checksum):
+                continue
+            yield entry.path, dst_file, entry.stat().st_size
+
+    stats = copy_in_pool(copies(), workers, link)
+    files.sort()
+    removed = sorted(set(previous) - set(files))
+    remove_files(dst, removed)
+    return files, stats, removed
@@ -6,8 +6,19 @@ from textnode import TextNode
 from blocktype import BlockType
 from textnode import TextType
 from parentnode import ParentNode
-from inline_functions import text_to_textnodes, text_node_to_html_node
-from block_functions import markdown_to_blocks, block_to_block_type
+from leafnode import LeafNode
+from block_cache import BlockCache
+from profiler import stage, timed_iter
+from inline_functions import text_to_html, text_to_textnodes, text_node_to_html_node
+from block_functions import iter_blocks, block_to_block_type
+
+# bump whenever rendering output changes so persisted caches are invalidated
+PARSER_VERSION = "1"
+
+CODE_OPEN_RE = re.compile(r'^```[^\n]*\n?')
+CODE_CLOSE_RE = re.compile(r'\n?```$')
+UL_ITEM_RE = re.compile(r'\s*(\.\s*|\*\s*|-\s*)')
+OL_ITEM_RE = re.compile(r'\s*\d+\.\s*')
 
 
 # quote <quoteblock>
@@ -16,53 +27,110 @@ from block_functions import markdown_to_blocks, block_to_block_type
 # code <code> nested in <pre>
 # heading <h1> <h2> <h3> <h4> <h5> <h6>
 # paragraph <p>
-def markdown_to_html_node(markdown: str) -> HTMLNode:
-    md_blocks: list[str] = markdown_to_blocks(markdown)
+def markdown_to_html_node(markdown: str, cache: BlockCache = None) -> HTMLNode:
     children_nodes = []
-    for block in md_blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.PARAGRAPH:
-            children_nodes.append(process_paragraph(process_block(block)))
-        elif block_type == BlockType.HEADING:
-            result = process_heading(block)
-            if isinstance(result, list):
-                children_nodes.extend(result)
-            else:
-                children_nodes.append(result)
-        elif block_type == BlockType.QUOTE:
-            children_nodes.append(process_quote(block))
-        elif block_type == BlockType.ORDERED_LIST:
-            children_nodes.append(process_ol(block))
-        elif block_type == BlockType.UNORDERED_LIST:
-            children_nodes.append(process_ul(block))
-        elif block_type == BlockType.CODE:
-            children_nodes.append(process_code(block))
+    for block_type, lines in split_blocks(markdown.split("\n")):
+        block = "\n".join(lines)
+        if cache is None:
+            with stage("inline parse"):
+                children_nodes.extend(BLOCK_NODE_HANDLERS[block_type](block))
+            continue
+        # cached blocks come back as raw HTML leaves; only changed blocks are parsed again
+        children_nodes.append(LeafNode(None, cached_block_to_html(block, cache, block_type)))
     return ParentNode('div', children_nodes)
 
+# direct rendering: the same HTML as markdown_to_html_node(...).to_html(), written straight
+# from blocks and inline tokens without building TextNode/LeafNode/ParentNode trees
+def markdown_to_html(markdown: str, cache: BlockCache = None) -> str:
+    return "".join(iter_markdown_html(markdown, cache))
+
+def iter_markdown_html(markdown, cache: BlockCache = None):
+    # yields the page HTML one block at a time; markdown is a string or an iterable of lines
+    if isinstance(markdown, str):
+        markdown = markdown.split("\n")
+    yield "<div>"
+    for block_type, lines in split_blocks(markdown):
+        block = "\n".join(lines)
+        if cache is None:
+            yield block_type_to_html(block, block_type)
+        else:
+            yield cached_block_to_html(block, cache, block_type)
+    yield "</div>"
+
+def split_blocks(lines):
+    return timed_iter("block split", iter_blocks(lines))
+
+def cached_block_to_html(block: str, cache: BlockCache, block_type: BlockType = None) -> str:
+    html = cache.get(block)
+    if html is None:
+        html = block_to_html(block, block_type)
+        cache.put(block, html)
+    return html
+
+def block_to_html(block: str, block_type: BlockType = None) -> str:
+    if block_type is None:
+        with stage("block typing"):
+            block_type = block_to_block_type(block)
+    return block_type_to_html(block, block_type)
+
+def block_type_to_html(block: str, block_type: BlockType) -> str:
+    with stage("inline parse"):
+        return BLOCK_HANDLERS[block_type](block)
+
+def paragraph_to_html(block: str) -> str:
+    return f"<p>{text_to_html(process_block(block))}</p>"
+
+def heading_to_html(block: str) -> str:
+    return "".join(f"<h{level}>{text_to_html(text)}</h{level}>" for level, text in heading_parts(block))
+
+def quote_to_html(block: str) -> str:
+    return f"<blockquote>{text_to_html(quote_text(block))}</blockquote>"
+
+def ol_to_html(block: str) -> str:
+    return list_to_html("ol", block, BlockType.ORDERED_LIST)
+
+def ul_to_html(block: str) -> str:
+    return list_to_html("ul", block, BlockType.UNORDERED_LIST)
+
+def code_to_html(block: str) -> str:
+    return f"<pre><code>{code_text(block)}</code></pre>"
+
+def list_to_html(tag: str, block: str, block_type: BlockType = None) -> str:
+    items = "".join(f"<li>{text_to_html(item)}</li>" for item in process_list_items(block, block_type))
+    return f"<{tag}>{items}</{tag}>"
+
+def heading_nodes(block: str) -> list[HTMLNode]:
+    result = process_heading(block)
+    if isinstance(result, list):
+        return result
+    return [result]
+
 def process_block(block: str) -> str:
     lines = [line.strip() for line in block.strip().splitlines() if line.strip()]
     processed_block = " ".join(lines)
     return processed_block
 
 def process_code(block: str) -> HTMLNode:
-    block = re.sub(r'^```[^\n]*\n?', '', block)   # remove opening ```
-    block = re.sub(r'\n?```$', '', block)         # remove closing ```
-    block = textwrap.dedent(block) # dedent the block
-    block = block.rstrip('\n') + '\n'
-    node = TextNode(block, TextType.CODE)
+    node = TextNode(code_text(block), TextType.CODE)
     node = text_node_to_html_node(node)
     return ParentNode('pre', [node])
 
-def process_ul(block: str) -> HTMLNode:
+def code_text(block: str) -> str:
+    block = CODE_OPEN_RE.sub('', block, count=1)   # remove opening ```
+    block = CODE_CLOSE_RE.sub('', block, count=1)  # remove closing ```
+    block = textwrap.dedent(block) # dedent the block
+    return block.rstrip('\n') + '\n'
+
+def process_ul(block: str, block_type: BlockType = None) -> HTMLNode:
     list_items = []
-    li = process_list_items(block)
+    li = process_list_items(block, block_type)
     for item in li:
         list_items.append(ParentNode('li', text_to_children(item)))
     return ParentNode('ul', list_items)
 
-def process_ol(block: str) -> HTMLNode:
+def process_ol(block: str, block_type: BlockType = None) -> HTMLNode:
     list_nodes = []
-    li = process_list_items(block)
+    li = process_list_items(block, block_type)
     for item in li:
         list_nodes.append(ParentNode('li', text_to_children(item)))
     return ParentNode('ol', list_nodes)
@@ -71,9 +139,12 @@ def process_paragraph(block: str) -> HTMLNode:
     return ParentNode('p', text_to_children(block))
 
 def process_quote(block: str) -> HTMLNode:
+    return ParentNode("blockquote", text_to_children(quote_text(block)))
+
+def quote_text(block: str) -> str:
     split = block.split('\n')
     if len(split) == 1:
-        return ParentNode("blockquote", text_to_children(block.replace("> ", '').strip()))
+        return block.replace("> ", '').strip()
     else:
         joined = ""
         for line in split:
@@ -81,27 +152,28 @@ def process_quote(block: str) -> HTMLNode:
             if len(line) == 1:
                 continue
             joined += f"{line.replace('>', '').strip()} "
-        return ParentNode("blockquote", text_to_children(joined.rstrip()))
+        return joined.rstrip()
 
 
 def process_heading(block: str) -> HTMLNode:
+    heading_node = []
+    for heading_level, heading_text in heading_parts(block):
+        heading_node.append(ParentNode(f'h{heading_level}', text_to_children(heading_text)))
+    return heading_node[0] if len(heading_node) == 1 else heading_node
+
+def heading_parts(block: str) -> list[tuple[int, str]]:
     lines = [line.strip() for line in block.splitlines() if line.strip()]
     
     # single heading
     if len(lines) == 1:
-        heading_level = lines[0].count('#')
-        heading_text = lines[0].lstrip('#').strip()
-        return ParentNode(f'h{heading_level}', text_to_children(heading_text))
+        return [(lines[0].count('#'), lines[0].lstrip('#').strip())]
     
     # multiple headings
-    heading_node = []
+    parts = []
     for line in lines:
         if line.startswith('#'):
-            heading_level = line.count('#')
-            heading_text = line.lstrip('#').strip()
-            heading_node.append(ParentNode(f'h{heading_level}', text_to_children(heading_text)))
-    
-    return heading_node[0] if len(heading_node) == 1 else heading_node
+            parts.append((line.count('#'), line.lstrip('#').strip()))
+    return parts
 
 def text_to_children(text: str) -> list:
     nodes = text_to_textnodes(text)
@@ -111,14 +183,38 @@ def text_to_children(text: str) -> list:
     return html_nodes
 
 
-def process_list_items(list_items: str) -> list[str]:
-    block_type = block_to_block_type(list_items)
+def process_list_items(list_items: str, block_type: BlockType = None) -> list[str]:
+    if block_type is None:
+        block_type = block_to_block_type(list_items)
     lines = list_items.split('\n')
     processed_lines = []
     if block_type == BlockType.UNORDERED_LIST:
-        for line in lines:
-            processed_lines.append(re.sub(r'^\s*(\.\s*|\*\s*|-\s*)', '', line))
+        marker = UL_ITEM_RE.match
     elif block_type == BlockType.ORDERED_LIST:
-        for line in lines:
-            processed_lines.append(re.sub(r'^\s*\d+\.\s*', '', line))
-    return processed_lines
\ No newline at end of file
+        marker = OL_ITEM_RE.match
+    else:
+        return processed_lines
+    for line in lines:
+        match = marker(line)
+        processed_lines.append(line[match.end():] if match else line)
+    return processed_lines
+
+
+# block type -> renderer, for the direct HTML path and the node tree path
+BLOCK_HANDLERS = {
+    BlockType.PARAGRAPH: paragraph_to_html,
+    BlockType.HEADING: heading_to_html,
+    BlockType.QUOTE: quote_to_html,
+    BlockType.ORDERED_LIST: ol_to_html,
+    BlockType.UNORDERED_LIST: ul_to_html,
+    BlockType.CODE: code_to_html,
+}
+
+BLOCK_NODE_HANDLERS = {
+    BlockType.PARAGRAPH: lambda block: [process_paragraph(process_block(block))],
+    BlockType.HEADING: heading_nodes,
+    BlockType.QUOTE: lambda block: [process_quote(block)],
+    BlockType.ORDERED_LIST: lambda block: [process_ol(block, BlockType.ORDERED_LIST)],
+    BlockType.UNORDERED_LIST: lambda block: [process_ul(block, BlockType.UNORDERED_LIST)],
+    BlockType.CODE: lambda block: [process_code(block)],
+}
\ No newline at end of file
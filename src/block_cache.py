@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+BLOCK_CACHE_NAME = "blocks.json"
+
+
+class BlockCache():
+    # content-addressed LRU mapping a markdown block to its rendered HTML fragment,
+    # bounded by the total size of the cached fragments
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, version: str = ""):
+        self.max_bytes = max_bytes
+        self.version = version
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.added = None  # entries put since the last take_added(), once recording is on
+
+    def record_added(self):
+        # pool workers render into their own copy of the cache and report what they added
+        self.added = {}
+
+    def take_added(self) -> list[tuple[str, str]]:
+        if not self.added:
+            return []
+        added = list(self.added.items())
+        self.added = {}
+        return added
+
+    def key(self, block: str) -> str:
+        return hashlib.sha1(f"{self.version}\0{block}".encode()).hexdigest()
+
+    def get(self, block: str):
+        key = self.key(block)
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, block: str, html: str):
+        key = self.key(block)
+        self.store(key, html)
+        if self.added is not None:
+            self.added[key] = html
+
+    def store(self, key: str, html: str):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        if len(html) > self.max_bytes:
+            return
+        self.entries[key] = html
+        self.size += len(html)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, path: str):
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable block cache {path} {e}")
+            return
+        if data.get("version") != self.version:
+            return
+        for key, html in data.get("entries", []):
+            self.store(key, html)
+
+    def save(self, path: str):
+        # written to a temporary file first so a concurrent reader never sees a partial cache
+        data = {"version": self.version, "entries": list(self.entries.items())}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except (OSError, IOError) as e:
+            print(f"Error writting block cache {e}")
+            raise
+
+    def __repr__(self):
+        return f"BlockCache({len(self.entries)} blocks, {self.size} bytes, {self.hits} hits, {self.misses} misses)"
@@ -1,4 +1,5 @@
 from blocktype import BlockType
+from profiler import stage
 
 
 # def markdown_to_blocks(markdown: str):
@@ -20,48 +21,92 @@ from blocktype import BlockType
     
 #     return [paragraph for paragraph in paragraphs if len(paragraph)!=0]
 
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
+    return ["\n".join(lines) for _, lines in iter_blocks(markdown.split("\n"))]
+
+
+def iter_blocks(lines):
+    # single pass over an iterable of lines (with or without their newlines), yielding
+    # (block_type, lines) for each block; blocks are separated by blank lines, except inside
+    # a fenced code block, whose lines are passed through without being looked at again
+    block = []
+    fence = None
+    for line in lines:
+        line = line.rstrip("\n")
+        stripped = line.strip()
+        if fence is not None:
+            fence.append(line)
+            if stripped.startswith("```") and not stripped.strip("`"):
+                yield BlockType.CODE, trim_block(fence)
+                fence = None
+            continue
+        if stripped.startswith("```") and "```" not in stripped[3:]:
+            if block:
+                yield classify_block(block), block
+                block = []
+            fence = [line]
+            continue
+        if not stripped:
+            if block:
+                yield classify_block(block), block
+                block = []
             continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
+        block.append(line)
+    # an unclosed fence is not code; it is classified like any other block
+    if fence is not None:
+        block.extend(line for line in fence if line.strip())
+    if block:
+        yield classify_block(block), block
+
+
+def classify_block(lines: list[str]) -> BlockType:
+    with stage("block typing"):
+        return classify_lines(trim_block(lines))
+
+
+def trim_block(lines: list[str]) -> list[str]:
+    # the first and last line lose their outer whitespace, like a stripped block string
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
 
 
 def block_to_block_type(markdown: str) -> BlockType:
-    if markdown.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        if markdown.count('#') > 6:
+    return classify_lines(markdown.split('\n'))
+
+
+def classify_lines(lines: list[str]) -> BlockType:
+    first = lines[0]
+    if first.startswith(HEADING_PREFIXES):
+        if sum(line.count('#') for line in lines) > 6:
             return BlockType.PARAGRAPH
         return BlockType.HEADING
     
-    if markdown.startswith("```") and markdown.endswith("```"):
+    if first.startswith("```") and lines[-1].endswith("```"):
         return BlockType.CODE
     
-    if markdown.startswith("> "):
-        lines = markdown.split('\n')
+    if first.startswith("> "):
         for line in lines:
             line = line.strip()
             if not line.startswith(">"):
                 return BlockType.PARAGRAPH
         return BlockType.QUOTE
     
-    if markdown.startswith("- "):
-        lines = markdown.split('\n')
+    if first.startswith("- "):
         for line in lines:
             line = line.strip()
             if not line.startswith("- "):
                 return BlockType.PARAGRAPH
         return BlockType.UNORDERED_LIST
     
-    if markdown.startswith("1. "):
-        list_items = markdown.split('\n')
-        for idx, item in enumerate(list_items):
+    if first.startswith("1. "):
+        for idx, item in enumerate(lines):
             item = item.strip()
             if not item.startswith(f"{idx+1}. "):
                 return BlockType.PARAGRAPH
         return BlockType.ORDERED_LIST
     
-    return BlockType.PARAGRAPH
\ No newline at end of file
+    return BlockType.PARAGRAPH
@@ -0,0 +1,304 @@
+import copy
+import json
+import os
+
+import profiler
+from block_cache import BLOCK_CACHE_NAME, BlockCache
+from compress import precompress
+from fingerprint import ASSET_MANIFEST_NAME, fingerprint_assets
+from FSoperations import copy_files, list_files, remove_files, sync_files
+from generator import use_block_cache, use_image_attributes, use_page_cache
+from images import image_attributes, process_images
+from inline_functions import extract_markdown_images
+from MDtoHTML import PARSER_VERSION
+from manifest import MANIFEST_NAME, Manifest, hash_bytes, hash_file
+from listings import build_listings, render_listings
+from page_cache import PAGE_CACHE_NAME, PageCache
+from page_index import Page, build_index
+from scheduler import BuildError, render_pages
+from template import use_asset_urls
+from writer import sync_written, use_deferred_sync, use_minify, write_output
+
+# static files written through the minifier instead of being copied when minifying
+MINIFIED_ASSET_EXTENSIONS = (".css",)
+
+
+class BuildOptions():
+    # everything about a build besides where its inputs and outputs live
+    def __init__(self, incremental: bool = False, jobs: int = 0, cache_dir: str = None,
+                 cache_max_bytes: int = 256 * 1024 * 1024, checksum: bool = False, link_assets: bool = False,
+                 copy_workers: int = None, drafts: bool = False, fingerprint: bool = False, compress: bool = False,
+                 minify: bool = False):
+        self.incremental = incremental
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.checksum = checksum
+        self.link_assets = link_assets
+        self.copy_workers = copy_workers
+        self.drafts = drafts
+        self.fingerprint = fingerprint
+        self.compress = compress
+        self.minify = minify
+
+
+def build_site(content_dir: str, static_dir: str, public_dir: str, template_path: str, basepath: str,
+               options: BuildOptions = None) -> Manifest:
+    options = copy.copy(options) if options is not None else BuildOptions()
+    manifest_path = os.path.join(public_dir, MANIFEST_NAME)
+    # full builds read the previous manifest too, for the hashes of the files they compress
+    previous = Manifest.load(manifest_path)
+
+    if profiler.PROFILER is not None and options.jobs != 1:
+        print("Profiling renders pages serially so stages can be attributed to pages")
+        options.jobs = 1
+
+    cache = None
+    page_cache = None
+    if options.cache_dir is not None:
+        # pool workers report the blocks they rendered back to this process before it saves the
+        # block cache; page bodies are shared on disk, so workers fill that cache directly
+        cache = BlockCache(version=PARSER_VERSION)
+        cache.load(os.path.join(options.cache_dir, BLOCK_CACHE_NAME))
+        use_block_cache(cache)
+        page_cache = PageCache(os.path.join(options.cache_dir, PAGE_CACHE_NAME), options.cache_max_bytes,
+                               PARSER_VERSION)
+        use_page_cache(page_cache)
+    use_minify(options.minify)
+    use_deferred_sync(True)
+
+    if previous is None or not options.incremental:
+        manifest, failures = full_build(content_dir, static_dir, public_dir, template_path, basepath, previous,
+                                        options)
+    else:
+        manifest, failures = incremental_build(content_dir, static_dir, public_dir, template_path, basepath, previous,
+                                               options)
+
+    # failed pages are marked so the next incremental build retries them, and keep their output
+    # path so it is still pruned once their source is gone
+    for src_dir in failures:
+        entry = manifest.pages.get(os.path.relpath(os.path.join(src_dir, "index.md"), content_dir))
+        if entry is not None:
+            entry["failed"] = True
+    # outputs are flushed to disk before the manifest that records them
+    with profiler.stage("sync"):
+        sync_written()
+    manifest.save(manifest_path)
+    if cache is not None:
+        cache.save(os.path.join(options.cache_dir, BLOCK_CACHE_NAME))
+        use_block_cache(None)
+    if page_cache is not None:
+        page_cache.evict()
+        use_page_cache(None)
+    use_image_attributes(None)
+    use_asset_urls(None)
+    use_minify(False)
+    use_deferred_sync(False)
+    if failures:
+        raise BuildError(failures)
+    return manifest
+
+
+def full_build(content_dir: str, static_dir: str, public_dir: str, template_path: str, basepath: str,
+               previous: Manifest, options: BuildOptions) -> tuple[Manifest, dict]:
+    manifest = Manifest()
+    skip = MINIFIED_ASSET_EXTENSIONS if options.minify else ()
+    # rendered over the existing tree, so identical outputs keep their mtime; whatever the build
+    # did not produce is pruned at the end
+    with profiler.stage("static copy"):
+        print(copy_files(static_dir, public_dir, workers=options.copy_workers, skip=skip).summary())
+        for rel_path in list_files(static_dir):
+            manifest.assets[rel_path] = asset_entry(static_dir, rel_path)
+    with profiler.stage("minify"):
+        minify_assets(static_dir, public_dir, manifest.assets, skip)
+    with profiler.stage("fingerprint"):
+        asset_urls = use_fingerprints(public_dir, manifest.assets, options.fingerprint)
+    with profiler.stage("discovery"):
+        pages = build_index(content_dir, public_dir, options.drafts)
+    with profiler.stage("manifest"):
+        template_hash = template_key(template_path, asset_urls, options.minify)
+        for page in pages:
+            manifest.pages[page.rel_path] = page_entry(page, public_dir, template_hash, basepath)
+    with profiler.stage("images"):
+        # variants already in public_dir are reused once their source is hashed again
+        manifest.images = process_images(static_dir, public_dir, options.cache_dir,
+                                         previous.images if previous is not None else None, options.jobs,
+                                         options.link_assets, True, referenced_images(manifest.pages))
+        use_images(manifest.images, basepath, asset_urls, manifest.pages)
+    failures = render_pages([page.dirs() for page in pages], template_path, basepath, options.jobs)
+
+    with profiler.stage("listings"):
+        manifest.listings = render_listings(build_listings(pages), template_path, public_dir, basepath, template_hash)
+    if options.compress:
+        with profiler.stage("compression"):
+            # compressed copies kept from the last build are only redone when their file changed
+            old_compressed = previous.compressed if previous is not None else None
+            manifest.compressed = precompress(public_dir, manifest.outputs(), old_compressed, options.jobs)
+
+    orphans = set(list_files(public_dir)) - manifest.outputs() - {MANIFEST_NAME, ASSET_MANIFEST_NAME}
+    for rel_path in sorted(orphans):
+        print(f"Removing {rel_path}")
+    remove_files(public_dir, orphans)
+    return manifest, failures
+
+
+def incremental_build(content_dir: str, static_dir: str, public_dir: str, template_path: str, basepath: str,
+                      previous: Manifest, options: BuildOptions) -> tuple[Manifest, dict]:
+    manifest = Manifest()
+    os.makedirs(public_dir, exist_ok=True)
+    skip = MINIFIED_ASSET_EXTENSIONS if options.minify else ()
+
+    with profiler.stage("static copy"):
+        files, stats, removed = sync_files(static_dir, public_dir, previous.assets, checksum=options.checksum,
+                                           link=options.link_assets, workers=options.copy_workers, skip=skip)
+        for rel_path in files:
+            manifest.assets[rel_path] = asset_entry(static_dir, rel_path)
+    with profiler.stage("minify"):
+        minify_assets(static_dir, public_dir, manifest.assets, skip, None if options.checksum else previous.assets)
+    print(stats.summary())
+    for rel_path in removed:
+        print(f"Removing {rel_path}")
+    with profiler.stage("fingerprint"):
+        asset_urls = use_fingerprints(public_dir, manifest.assets, options.fingerprint,
+                                      None if options.checksum else previous.assets)
+    with profiler.stage("discovery"):
+        pages = build_index(content_dir, public_dir, options.drafts, None if options.checksum else previous.pages)
+    with profiler.stage("manifest"):
+        template_hash = template_key(template_path, asset_urls, options.minify)
+        for page in pages:
+            old_entry = previous.pages.get(page.rel_path)
+            manifest.pages[page.rel_path] = page_entry(page, public_dir, template_hash, basepath,
+                                                       None if options.checksum else old_entry)
+    with profiler.stage("images"):
+        manifest.images = process_images(static_dir, public_dir, options.cache_dir, previous.images, options.jobs,
+                                         options.link_assets, options.checksum, referenced_images(manifest.pages))
+        use_images(manifest.images, basepath, asset_urls, manifest.pages)
+
+    stale_pages = []
+    for page in pages:
+        if is_current(previous.pages.get(page.rel_path), manifest.pages[page.rel_path]) and os.path.exists(page.output):
+            continue
+        stale_pages.append(page.dirs())
+    failures = render_pages(stale_pages, template_path, basepath, options.jobs)
+    with profiler.stage("listings"):
+        manifest.listings = render_listings(build_listings(pages), template_path, public_dir, basepath, template_hash,
+                                            previous.listings)
+    if options.compress:
+        with profiler.stage("compression"):
+            manifest.compressed = precompress(public_dir, manifest.outputs(), previous.compressed, options.jobs)
+
+    # assets were already pruned by sync_files
+    orphans = previous.outputs() - manifest.outputs() - set(previous.assets)
+    for rel_path in sorted(orphans):
+        print(f"Removing {rel_path}")
+    remove_files(public_dir, orphans)
+    return manifest, failures
+
+
+def asset_entry(static_dir: str, rel_path: str) -> dict:
+    stat = os.stat(os.path.join(static_dir, rel_path))
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "output": rel_path,
+    }
+
+
+# size and mtime only decide whether the source needs hashing, not whether the page is stale
+PAGE_INPUTS = ("hash", "parser", "template", "basepath", "images", "output")
+
+def is_current(previous: dict, entry: dict) -> bool:
+    if previous is None or previous.get("failed"):
+        return False
+    return all(previous.get(key) == entry[key] for key in PAGE_INPUTS)
+
+
+def use_fingerprints(public_dir: str, assets: dict, fingerprint: bool, previous: dict = None) -> dict:
+    # hands the fingerprinted asset URLs to the renderer; without fingerprinting, the asset
+    # manifest of an earlier fingerprinted build is removed along with its copies
+    if not fingerprint:
+        remove_files(public_dir, [ASSET_MANIFEST_NAME])
+        use_asset_urls(None)
+        return {}
+    asset_urls = fingerprint_assets(public_dir, assets, previous)
+    use_asset_urls(asset_urls)
+    return asset_urls
+
+
+def template_key(template_path: str, asset_urls: dict, minify: bool = False) -> str:
+    # fingerprinted URLs are compiled into the template and minification rewrites everything it
+    # renders, so both count as part of it: a changed asset hash or toggling minification
+    # re-renders every page and listing
+    template_hash = hash_file(template_path)
+    if not asset_urls and not minify:
+        return template_hash
+    return hash_bytes(f"{template_hash}\0{json.dumps(asset_urls, sort_keys=True)}\0{minify}".encode())
+
+
+def minify_assets(static_dir: str, public_dir: str, assets: dict, extensions: tuple[str, ...],
+                  previous: dict = None) -> None:
+    # writes the minified copy of every static file with one of extensions, unless the previous
+    # build already minified a source with the same size and mtime
+    previous = previous or {}
+    for rel_path, entry in assets.items():
+        if not rel_path.endswith(extensions):
+            continue
+        entry["minified"] = True
+        old_entry = previous.get(rel_path) or {}
+        dst_file = os.path.join(public_dir, rel_path)
+        unchanged = old_entry.get("size") == entry["size"] and old_entry.get("mtime") == entry["mtime"]
+        if old_entry.get("minified") and unchanged and os.path.exists(dst_file):
+            continue
+        print(f"Minifying {rel_path}")
+        with open(os.path.join(static_dir, rel_path), "r") as src_file:
+            write_output(dst_file, src_file)
+
+
+def use_images(images: dict, basepath: str, asset_urls: dict, pages: dict) -> None:
+    # hands the <img> attributes to the renderer and records in each page entry the hash of those
+    # of the images it embeds, so a page goes stale only when one of its own images changes
+    attributes = image_attributes(images, basepath, asset_urls)
+    use_image_attributes(attributes)
+    for entry in pages.values():
+        used = {url: attributes[url] for url in entry["image_urls"] if url in attributes}
+        entry["images"] = hash_bytes(json.dumps(used, sort_keys=True).encode()) if used else ""
+
+
+def page_images(path: str) -> list[str]:
+    # site URLs of the images a page embeds, the only ones whose attributes end up in its output
+    urls = set()
+    with open(path, "r") as md_file:
+        for line in md_file:
+            urls.update(url for _, url in extract_markdown_images(line) if url.startswith("/"))
+    return sorted(urls)
+
+
+def referenced_images(pages: dict) -> set[str]:
+    # static-relative paths of the images embedded by any of the page entries
+    return {url[1:].replace("/", os.sep) for entry in pages.values() for url in entry["image_urls"]}
+
+
+def page_entry(page: Page, public_dir: str, template_hash: str, basepath: str, previous: dict = None) -> dict:
+    # the source is only hashed and scanned for images again when its size or mtime moved since
+    # the previous build; "images" is filled in by use_images once the images are processed
+    unchanged = previous is not None and previous.get("size") == page.size and previous.get("mtime") == page.mtime
+    if unchanged and "image_urls" in previous:
+        source_hash = previous["hash"]
+        image_urls = previous["image_urls"]
+    else:
+        source_hash = hash_file(page.source)
+        image_urls = page_images(page.source)
+    return {
+        "hash": source_hash,
+        # a renderer upgrade changes the output of every page, whether or not its source changed
+        "parser": PARSER_VERSION,
+        "size": page.size,
+        "mtime": page.mtime,
+        "template": template_hash,
+        "basepath": basepath,
+        "images": "",
+        "image_urls": image_urls,
+        "output": os.path.relpath(page.output, public_dir),
+        "front_matter": page.front_matter,
+        "title": page.title,
+    }
@@ -0,0 +1,100 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from manifest import hash_file
+from scheduler import resolve_jobs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt")
+# below this a compressed response saves nothing worth the extra file
+MIN_COMPRESS_SIZE = 256
+
+
+def compression_formats() -> tuple[str, ...]:
+    return (".gz", ".br") if brotli is not None else (".gz",)
+
+
+def compress_data(data: bytes, extension: str) -> bytes:
+    if extension == ".br":
+        return brotli.compress(data, quality=11)
+    # a fixed mtime in the header keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_file(path: str, extensions: tuple[str, ...]):
+    # runs inside a worker process, so errors are reported back as text rather than raised
+    tmp_file = None
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        for extension in extensions:
+            tmp_file = f"{path}{extension}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(compress_data(data, extension))
+            os.replace(tmp_file, f"{path}{extension}")
+    except Exception as e:
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def compress_files(paths: list[str], extensions: tuple[str, ...], jobs: int = 0) -> dict[str, str]:
+    # writes the compressed siblings of every path and returns {path: error} for failures
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(paths) < 2:
+        results = [compress_file(path, extensions) for path in paths]
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+                results = list(pool.map(compress_file, paths, [extensions] * len(paths)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Process pool unavailable, compressing serially {e}")
+            results = [compress_file(path, extensions) for path in paths]
+    return {path: error for path, error in zip(paths, results) if error is not None}
+
+
+def precompress(public_dir: str, outputs, previous: dict = None, jobs: int = 0) -> dict:
+    # writes .gz (and .br when brotli is installed) siblings for the compressible files among
+    # outputs (public-relative paths). A file is only compressed again when its content hash moved
+    # or a sibling went missing, and only hashed again when its size or mtime moved.
+    # Returns the manifest entries, public-relative path -> {"size", "mtime", "hash", "outputs"}
+    previous = previous or {}
+    extensions = compression_formats()
+    entries = {}
+    paths = []
+    for rel_path in sorted(outputs):
+        if not rel_path.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        path = os.path.join(public_dir, rel_path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if stat.st_size < MIN_COMPRESS_SIZE:
+            continue
+        old_entry = previous.get(rel_path) or {}
+        if old_entry.get("size") == stat.st_size and old_entry.get("mtime") == stat.st_mtime_ns:
+            file_hash = old_entry["hash"]
+        else:
+            file_hash = hash_file(path)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": file_hash, "outputs": [rel_path + extension for extension in extensions]}
+        entries[rel_path] = entry
+        unchanged = old_entry.get("hash") == file_hash and old_entry.get("outputs") == entry["outputs"]
+        if unchanged and all(os.path.exists(os.path.join(public_dir, output)) for output in entry["outputs"]):
+            continue
+        paths.append(path)
+
+    if paths:
+        print(f"Compressing {len(paths)} files to {', '.join(extensions)}")
+    failures = compress_files(paths, extensions, jobs)
+    for path, error in failures.items():
+        print(f"Error compressing file {path} {error}")
+        entries.pop(os.path.relpath(path, public_dir), None)
+    return entries
@@ -0,0 +1,40 @@
+import json
+import os
+
+from FSoperations import copy_file
+from manifest import hash_file
+from writer import write_output
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 10
+
+
+def fingerprinted_name(rel_path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def fingerprint_assets(public_dir: str, assets: dict, previous: dict = None) -> dict[str, str]:
+    # puts a copy of every static file named after the hash of its public copy (which differs from
+    # the source when minified) next to that copy and adds "hash" and "fingerprint" to its manifest
+    # entry. Files with the size, mtime and minification recorded in previous keep their hash
+    # without being read, so unchanged assets keep their URL from build to build. Writes the
+    # plain -> fingerprinted name map to asset-manifest.json and returns it as site URLs
+    previous = previous or {}
+    names = {}
+    for rel_path, entry in assets.items():
+        old_entry = previous.get(rel_path) or {}
+        unchanged = old_entry.get("size") == entry["size"] and old_entry.get("mtime") == entry["mtime"]
+        if "hash" in old_entry and unchanged and old_entry.get("minified") == entry.get("minified"):
+            entry["hash"] = old_entry["hash"]
+        else:
+            entry["hash"] = hash_file(os.path.join(public_dir, rel_path))
+        entry["fingerprint"] = fingerprinted_name(rel_path, entry["hash"])
+        dst_file = os.path.join(public_dir, entry["fingerprint"])
+        if not os.path.exists(dst_file):
+            # a hardlink costs nothing, and copy_file never writes through one when the plain copy changes
+            copy_file(os.path.join(public_dir, rel_path), dst_file, link=True)
+        names[rel_path.replace(os.sep, "/")] = entry["fingerprint"].replace(os.sep, "/")
+
+    write_output(os.path.join(public_dir, ASSET_MANIFEST_NAME), [json.dumps(names, indent=2, sort_keys=True)])
+    return {f"/{name}": f"/{fingerprint}" for name, fingerprint in names.items()}
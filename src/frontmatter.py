@@ -0,0 +1,87 @@
+import itertools
+import re
+
+# "---" opens YAML-style "key: value" front matter, "+++" TOML-style "key = value"
+FRONT_MATTER_DELIMITERS = {"---": ":", "+++": "="}
+FRONT_MATTER_KEY_RE = re.compile(r"([A-Za-z_][\w-]*)\s*([:=])\s*(.*)")
+FRONT_MATTER_ITEM_RE = re.compile(r"\s*-\s+(.*)")
+INT_RE = re.compile(r"[-+]?\d+")
+
+
+def split_front_matter(lines) -> tuple[dict, object]:
+    # consumes only the front matter block from an iterable of lines and returns it parsed,
+    # together with an iterator over the untouched body lines
+    lines = iter(lines)
+    first_line = next(lines, "")
+    delimiter = first_line.strip()
+    if delimiter not in FRONT_MATTER_DELIMITERS:
+        return {}, itertools.chain([first_line], lines)
+
+    head = []
+    for line in lines:
+        if line.strip() == delimiter:
+            body = itertools.dropwhile(lambda body_line: not body_line.strip(), lines)
+            return parse_front_matter(head, FRONT_MATTER_DELIMITERS[delimiter]), body
+        head.append(line)
+    raise ValueError(f"Unclosed front matter, expected a closing {delimiter}")
+
+
+def read_front_matter(path: str) -> tuple[dict, str]:
+    # (front matter, first body line) while reading no further than the start of the body
+    with open(path, "r") as f:
+        front_matter, lines = split_front_matter(f)
+        return front_matter, next(lines, "")
+
+
+def heading_title(line: str):
+    # the text of a level one "# Title" heading, None for anything else
+    if line.startswith('#') and line.count("#", 0, 6) == 1:
+        return line.strip("#").strip()
+    return None
+
+
+def page_title(front_matter: dict, first_line: str):
+    if "title" in front_matter:
+        return str(front_matter["title"])
+    return heading_title(first_line)
+
+
+def parse_front_matter(lines: list[str], separator: str = ":") -> dict:
+    front_matter = {}
+    list_key = None  # key of a YAML block list being filled by "- item" lines
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        item = FRONT_MATTER_ITEM_RE.fullmatch(line)
+        if item is not None and list_key is not None:
+            front_matter[list_key].append(parse_value(item.group(1)))
+            continue
+        match = FRONT_MATTER_KEY_RE.fullmatch(line)
+        if match is None or match.group(2) != separator:
+            raise ValueError(f"Invalid front matter on line {number}: {line}")
+        key, _, value = match.groups()
+        if value.strip() or separator != ":":
+            front_matter[key] = parse_value(value)
+            list_key = None
+        else:
+            front_matter[key] = []
+            list_key = key
+    return front_matter
+
+
+def parse_value(text: str):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        return [parse_value(item) for item in inner.split(",")] if inner else []
+    lowered = text.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    if INT_RE.fullmatch(text):
+        return int(text)
+    return text
@@ -1,67 +1,100 @@
+import itertools
 import os.path
-from MDtoHTML import markdown_to_html_node
+import re
+import profiler
+from block_cache import BlockCache
+from manifest import hash_file
+from frontmatter import heading_title, page_title, split_front_matter
+from MDtoHTML import iter_markdown_html
+from page_cache import CacheEntryError, PageCache
+from page_index import build_index
+from template import load_template, rebase_urls, rewrites_urls
+from writer import write_output
+
+# set by the builder or watch mode, and handed to pool workers by scheduler.use_render_settings
+BLOCK_CACHE = None
+PAGE_CACHE = None
+# site URL of an image -> extra <img> attributes (width, height, srcset), set by the builder
+IMAGE_ATTRIBUTES = {}
+IMG_SRC_RE = re.compile(r'<img src="(/[^"]*)"')
+
+def use_block_cache(cache: BlockCache = None):
+    global BLOCK_CACHE
+    BLOCK_CACHE = cache
+
+def use_page_cache(cache: PageCache = None):
+    global PAGE_CACHE
+    PAGE_CACHE = cache
+
+def use_image_attributes(attributes: dict = None):
+    global IMAGE_ATTRIBUTES
+    IMAGE_ATTRIBUTES = attributes or {}
+
 
 def extract_title(markdown: str):
-    blocks = markdown.split('\n')
-    if blocks[0].startswith('#') and blocks[0].count("#", 0, 6) == 1:
-        return blocks[0].strip("#").strip()
-    else:
+    title = heading_title(markdown.split('\n')[0])
+    if title is None:
         raise ValueError("Wrong header level for a title")
+    return title
 
 
 def generate_pages(src_path: str, template_path: str, dst_path: str, basepath: str):
-    print(f"Generating page from {src_path} to {dst_path} using {template_path}")
-    
-
-    dir_items = os.listdir(src_path)
-    for item in dir_items:
-        if os.path.isdir(os.path.join(src_path, item)):
-            os.mkdir(os.path.join(dst_path, item))
-            generate_pages(os.path.join(src_path, item), template_path, os.path.join(dst_path, item), basepath)
-        else:
-            generate_page(src_path, template_path, dst_path, basepath)
-    # src_path = os.path.join(src_path, "index.md") 
-    
-    # with open(src_path, "r") as md_file:
-    #     md_str = md_file.read()
-    # with open(template_path, "r") as template_file:
-    #     template_str = template_file.read()
-
-    # html_node = markdown_to_html_node(md_str)
-    # html_str = html_node.to_html()
-    # title = extract_title(md_str)
-    # template_str = template_str.replace("{{ Title }}", title)
-    # template_str = template_str.replace("{{ Content }}", html_str)
-    
-    # try:
-    #     with open(f"{dst_path}/index.html", "w") as html_file:
-    #         html_file.write(template_str)
-    #     return 
-    # except (OSError, IOError) as e:
-    #     print(f"Error writting HTML file {e}")
-    #     raise
+    for page in build_index(src_path, dst_path):
+        print(f"Generating page from {page.src_dir} to {page.dst_dir} using {template_path}")
+        os.makedirs(page.dst_dir, exist_ok=True)
+        generate_page(page.src_dir, template_path, page.dst_dir, basepath)
 
 
 def generate_page(src_path: str, template_path: str, dst_path: str, basepath: str):
     src_path = os.path.join(src_path, "index.md") 
     
-    with open(src_path, "r") as md_file:
-        md_str = md_file.read()
-    with open(template_path, "r") as template_file:
-        template_str = template_file.read()
-
-    html_node = markdown_to_html_node(md_str)
-    html_str = html_node.to_html()
-    title = extract_title(md_str)
-    template_str = template_str.replace("{{ Title }}", title)
-    template_str = template_str.replace("{{ Content }}", html_str)
-    template_str = template_str.replace('href="/', f'href="{basepath}')
-    template_str = template_str.replace('src="/', f'src="{basepath}')
-    
-    try:
-        with open(f"{dst_path}/index.html", "w") as html_file:
-            html_file.write(template_str)
-        return 
-    except (OSError, IOError) as e:
-        print(f"Error writting HTML file {e}")
-        raise
\ No newline at end of file
+    with profiler.page(src_path):
+        with profiler.stage("read"):
+            template = load_template(template_path, basepath)
+        cached = None
+        if PAGE_CACHE is not None:
+            with profiler.stage("page cache"):
+                source_hash = hash_file(src_path)
+                cached = PAGE_CACHE.lookup(source_hash)
+
+        # the source is streamed line by line into the output, so only the block being
+        # rendered is held in memory rather than whole copies of the page
+        with open(src_path, "r") as md_file:
+            with profiler.stage("read"):
+                front_matter, body = split_front_matter(md_file)
+                first_line = next(body, "")
+            title = page_title(front_matter, first_line)
+            if title is None:
+                title = extract_title(first_line)
+            lines = itertools.chain([first_line], profiler.timed_iter("read", body))
+            if cached is not None:
+                try:
+                    write_page(dst_path, template, title, profiler.timed_iter("page cache", PAGE_CACHE.iter_entry(cached)), basepath)
+                    return
+                except CacheEntryError as e:
+                    # the broken entry is gone and the partial output discarded, so render from source
+                    print(f"Rendering {src_path} from source instead of the page cache {e}")
+            fragments = iter_markdown_html(lines, BLOCK_CACHE)
+            if PAGE_CACHE is not None:
+                fragments = PAGE_CACHE.record(source_hash, fragments)
+            write_page(dst_path, template, title, fragments, basepath)
+
+
+def write_page(dst_path: str, template, title: str, fragments, basepath: str):
+    content = profiler.timed_iter("serialization", content_fragments(fragments, basepath))
+    context = {"Title": title, "Content": content}
+    with profiler.stage("write"):
+        write_output(f"{dst_path}/index.html", profiler.timed_iter("template fill", template.iter_render(context)))
+
+
+def content_fragments(fragments, basepath: str):
+    # fragments never split a tag, so each one can be rewritten on its own
+    if IMAGE_ATTRIBUTES:
+        fragments = (IMG_SRC_RE.sub(add_image_attributes, fragment) for fragment in fragments)
+    if not rewrites_urls(basepath):
+        return fragments
+    return (rebase_urls(fragment, basepath) for fragment in fragments)
+
+
+def add_image_attributes(match: re.Match) -> str:
+    return f"{match.group(0)}{IMAGE_ATTRIBUTES.get(match.group(1), '')}"
@@ -1,13 +1,24 @@
+import sys
 
 class HTMLNode():
+    # pages create tens of thousands of nodes, so they carry no per-instance __dict__
+    # and share one interned string per tag name
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str = None, value: str = None, children: list = None, props: dict = None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if isinstance(tag, str) else tag
         self.value = value
         self.children = children
         self.props = props
 
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method")
+
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, fp):
+        fp.writelines(self.iter_html())
     
     def props_to_html(self):
         if self.props is None:
@@ -0,0 +1,177 @@
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from FSoperations import copy_file, scan_files
+from manifest import hash_file
+from scheduler import resolve_jobs
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# widths of the resized variants offered through srcset; images narrower than a width skip it
+IMAGE_WIDTHS = (480, 960, 1600)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+RESIZABLE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+IMAGE_CACHE_NAME = "images"
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(path: str):
+    # (width, height) read from the PNG, GIF or JPEG header alone, None for anything else
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:2] == b"\xff\xd8":
+            return jpeg_size(f)
+    return None
+
+
+def jpeg_size(f):
+    # walks the segment headers up to the first start-of-frame marker
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] == 0xFF:
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if marker[1] in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+
+def variant_name(rel_path: str, width: int) -> str:
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}-{width}w{ext}"
+
+
+def resize_image(src_file: str, dst_file: str, width: int):
+    # runs inside a worker process, so errors are reported back as text rather than raised
+    tmp_file = f"{dst_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+        with Image.open(src_file) as image:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            if image.format == "JPEG":
+                resized.save(tmp_file, "JPEG", quality=82, optimize=True, progressive=True)
+            else:
+                resized.save(tmp_file, image.format, optimize=True)
+        os.replace(tmp_file, dst_file)
+    except Exception as e:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def resize_images(tasks: list[tuple[str, str, int]], jobs: int = 0) -> dict[str, str]:
+    # renders every (source, destination, width) variant and returns {destination: error} for failures
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(tasks) < 2:
+        results = [resize_image(*task) for task in tasks]
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+                results = list(pool.map(resize_image, *zip(*tasks)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Process pool unavailable, resizing serially {e}")
+            results = [resize_image(*task) for task in tasks]
+    return {task[1]: error for task, error in zip(tasks, results) if error is not None}
+
+
+def process_images(static_dir: str, public_dir: str, cache_dir: str = None, previous: dict = None, jobs: int = 0,
+                   link: bool = False, checksum: bool = False, referenced: set = None) -> dict:
+    # measures every image under static_dir and writes resized variants of those in referenced
+    # (static-relative paths, all of them when None) next to the copied original. Variants are cached under cache_dir by source hash, so each one is computed once;
+    # unchanged images (same size and mtime as in previous, unless checksum) are neither hashed nor
+    # measured again, and variants already in public_dir are only kept while the source hash matches.
+    # Returns the manifest entries, static-relative path -> {"size", "mtime", "hash", "width",
+    # "height", "variants": [[width, output], ...]}
+    previous = previous or {}
+    entries = {}
+    tasks = []
+    copies = []
+    if Image is None:
+        print("Pillow is not installed, images get width and height but no resized variants")
+
+    for rel_path, dir_entry in scan_files(static_dir):
+        if not rel_path.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        stat = dir_entry.stat()
+        old_entry = previous.get(rel_path) or {}
+        entry = dict(old_entry)
+        if checksum or entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime_ns:
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": hash_file(dir_entry.path)}
+            entry["width"], entry["height"] = image_size(dir_entry.path) or (None, None)
+        resizable = Image is not None and entry["width"] and rel_path.lower().endswith(RESIZABLE_EXTENSIONS)
+        if resizable and (referenced is None or rel_path in referenced):
+            entry["variants"] = [[width, variant_name(rel_path, width)] for width in IMAGE_WIDTHS if width < entry["width"]]
+        else:
+            entry["variants"] = []
+        entries[rel_path] = entry
+
+        # variant names carry no hash, so existing ones were made from the previous source
+        current = old_entry.get("hash") == entry["hash"]
+        for width, output in entry["variants"]:
+            dst_file = os.path.join(public_dir, output)
+            if current and os.path.exists(dst_file):
+                continue
+            if cache_dir is None:
+                tasks.append((dir_entry.path, dst_file, width))
+                continue
+            cached = os.path.join(cache_dir, IMAGE_CACHE_NAME, entry["hash"][:2], f"{entry['hash']}-{width}w{os.path.splitext(rel_path)[1]}")
+            if not os.path.exists(cached):
+                tasks.append((dir_entry.path, cached, width))
+            copies.append((cached, dst_file))
+
+    if tasks:
+        print(f"Resizing {len(tasks)} image variants")
+    failures = resize_images(tasks, jobs)
+    for dst_file, error in failures.items():
+        print(f"Error resizing image {dst_file} {error}")
+    for cached, dst_file in copies:
+        if cached in failures:
+            continue
+        os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+        copy_file(cached, dst_file, link=link)
+
+    # variants that failed are left out so pages never point at a missing file
+    failed = {os.path.relpath(path, public_dir) for path in failures}
+    failed.update(os.path.relpath(dst_file, public_dir) for cached, dst_file in copies if cached in failures)
+    for entry in entries.values():
+        entry["variants"] = [[width, output] for width, output in entry["variants"] if output not in failed]
+    return entries
+
+
+def image_attributes(entries: dict, basepath: str = "/", asset_urls: dict = None) -> dict[str, str]:
+    # site URL of each image -> the attributes added to its <img> tags; asset_urls maps the
+    # original to its fingerprinted URL when assets are fingerprinted
+    asset_urls = asset_urls or {}
+    attributes = {}
+    for rel_path, entry in entries.items():
+        if not entry.get("width"):
+            continue
+        url = "/" + rel_path.replace(os.sep, "/")
+        attrs = f' width="{entry["width"]}" height="{entry["height"]}"'
+        if entry["variants"]:
+            candidates = [f"{basepath}{output.replace(os.sep, '/')} {width}w" for width, output in entry["variants"]]
+            candidates.append(f"{basepath}{asset_urls.get(url, url)[1:]} {entry['width']}w")
+            attrs += f' srcset="{", ".join(candidates)}"'
+        attributes[url] = attrs
+    return attributes
@@ -2,8 +2,19 @@ from textnode import TextType, TextNode
 from leafnode import LeafNode
 import re
 
+# a single scan over the text finds the next opener; closers and link/image bodies are resolved from there
+INLINE_OPENER_RE = re.compile(r"\*\*|_|`|!?\[")
+INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+IMAGE_AT_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_AT_RE = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+MARKDOWN_LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def text_node_to_html_node(text_node: TextNode):
-    if text_node.text_type not in TextType:
+    if not isinstance(text_node.text_type, TextType):
         raise ValueError(f"Unsupported text type: {text_node.text_type}")
 
     match text_node.text_type:
@@ -53,11 +64,11 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delim: str, text_type: Text
     return new_nodes
 
 def extract_markdown_images(text: str):
-    result: list[str] = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    result: list[str] = IMAGE_AT_RE.findall(text)
     return result
 
 def extract_markdown_links(text: str):
-    result: list[str] = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    result: list[str] = MARKDOWN_LINK_RE.findall(text)
     return result
 
 def split_nodes_image(old_nodes: list[TextNode]):
@@ -118,11 +129,69 @@ def split_nodes_link(old_nodes: list[TextNode]):
         return nodes
 
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    return nodes
+def iter_inline_tokens(text: str):
+    # yields (text, text type, url) tuples in document order
+    text_start = 0  # start of the plain text not yet emitted
+    pos = 0
+    length = len(text)
+    while pos < length:
+        match = INLINE_OPENER_RE.search(text, pos)
+        if match is None:
+            break
+        opener = match.group()
+        start = match.start()
+
+        if opener in INLINE_DELIMITERS:
+            text_type = INLINE_DELIMITERS[opener]
+            close = text.find(opener, match.end())
+            if close == -1:
+                raise Exception(f"Markdown syntax error. Unclosed {text_type} element")
+            if start > text_start:
+                yield text[text_start:start], TextType.TEXT, None
+            if close > match.end():
+                yield text[match.end():close], text_type, None
+            pos = text_start = close + len(opener)
+            continue
+
+        if opener == "![":
+            link = IMAGE_AT_RE.match(text, start)
+            text_type = TextType.IMAGE
+        else:
+            link = LINK_AT_RE.match(text, start)
+            text_type = TextType.LINK
+        if link is None:
+            pos = match.end()
+            continue
+        if start > text_start:
+            yield text[text_start:start], TextType.TEXT, None
+        yield link.group(1), text_type, link.group(2)
+        pos = text_start = link.end()
+
+    if text_start < length:
+        yield text[text_start:], TextType.TEXT, None
+
+
+def text_to_textnodes(text: str) -> list[TextNode]:
+    return [TextNode(token, text_type, url) for token, text_type, url in iter_inline_tokens(text)]
+
+
+# the same markup LeafNode.to_html produces for the node text_node_to_html_node would build
+INLINE_TAGS = {
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+}
+
+def text_to_html(text: str) -> str:
+    parts = []
+    for token, text_type, url in iter_inline_tokens(text):
+        if text_type is TextType.TEXT:
+            parts.append(token)
+        elif text_type is TextType.LINK:
+            parts.append(f'<a href="{url}">{token}</a>')
+        elif text_type is TextType.IMAGE:
+            parts.append(f'<img src="{url}" alt="{token}"></img>')
+        else:
+            open_tag, close_tag = INLINE_TAGS[text_type]
+            parts.append(f"{open_tag}{token}{close_tag}")
+    return "".join(parts)
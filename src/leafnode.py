@@ -1,6 +1,8 @@
 from htmlnode import HTMLNode
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value : str = None , props: dict = None):
         super().__init__(tag, value, None, props)
 
@@ -0,0 +1,169 @@
+import html
+import json
+import os
+import re
+
+from generator import content_fragments
+from manifest import hash_bytes
+from page_index import PAGE_OUTPUT, Page
+from template import load_template
+from writer import write_output
+
+LISTING_PAGE_SIZE = 10
+TAGS_DIR = "tags"
+ARCHIVE_DIR = "archive"
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+class Listing():
+    # one page of a generated list of posts; entries are (title, url, date) tuples
+    def __init__(self, title: str, rel_dir: str, entries: list[tuple], newer: str = None, older: str = None, by_year: bool = False):
+        self.title = title
+        self.rel_dir = rel_dir
+        self.entries = entries
+        self.newer = newer
+        self.older = older
+        self.by_year = by_year
+
+    @property
+    def output(self) -> str:
+        return os.path.join(self.rel_dir, PAGE_OUTPUT)
+
+    def signature(self, template_hash: str, basepath: str) -> str:
+        # everything the rendered listing depends on; post bodies are not part of it
+        data = [self.title, self.entries, self.newer, self.older, self.by_year, template_hash, basepath]
+        return hash_bytes(json.dumps(data).encode())
+
+    def html(self) -> str:
+        parts = [f"<div><h1>{escape(self.title)}</h1>"]
+        year = None
+        items = []
+        for title, url, date in self.entries:
+            if self.by_year and date[:4] != year:
+                if items:
+                    parts.append(f"<ul>{''.join(items)}</ul>")
+                    items = []
+                year = date[:4]
+                parts.append(f"<h2>{escape(year)}</h2>")
+            when = f' <time datetime="{escape(date)}">{escape(date)}</time>' if date else ""
+            items.append(f'<li><a href="{url}">{escape(title)}</a>{when}</li>')
+        if items:
+            parts.append(f"<ul>{''.join(items)}</ul>")
+        links = []
+        if self.newer is not None:
+            links.append(f'<a href="{self.newer}">Newer</a>')
+        if self.older is not None:
+            links.append(f'<a href="{self.older}">Older</a>')
+        if links:
+            parts.append(f"<nav>{' '.join(links)}</nav>")
+        parts.append("</div>")
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"Listing({self.rel_dir}, {len(self.entries)} entries)"
+
+
+def escape(text: str) -> str:
+    return html.escape(text, quote=False)
+
+
+def page_url(rel_dir: str) -> str:
+    return "/" + rel_dir.replace(os.sep, "/") if rel_dir else "/"
+
+
+def page_rel_dir(page: Page) -> str:
+    return os.path.dirname(page.rel_path)
+
+
+def page_date(page: Page) -> str:
+    date = page.front_matter.get("date")
+    return "" if date is None else str(date)
+
+
+def page_tags(page: Page) -> list[str]:
+    tags = page.front_matter.get("tags", [])
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+
+def slugify(text: str) -> str:
+    return SLUG_RE.sub("-", text.lower()).strip("-")
+
+
+def newest_first(pages: list[Page]) -> list[Page]:
+    # dated posts newest first, then undated ones in index order
+    undated = [page for page in pages if not page_date(page)]
+    dated = sorted((page for page in pages if page_date(page)), key=page_date, reverse=True)
+    return dated + undated
+
+
+def entry(page: Page) -> tuple:
+    title = page.title if page.title is not None else os.path.basename(page_rel_dir(page))
+    return (title, page_url(page_rel_dir(page)), page_date(page))
+
+
+def paginate(title: str, rel_dir: str, pages: list[Page], page_size: int = LISTING_PAGE_SIZE, by_year: bool = False) -> list[Listing]:
+    # page 1 lives at rel_dir, page n at rel_dir/page/n
+    entries = [entry(page) for page in pages]
+    chunks = [entries[start:start + page_size] for start in range(0, len(entries), page_size)]
+    dirs = [rel_dir] + [os.path.join(rel_dir, "page", str(number)) for number in range(2, len(chunks) + 1)]
+    listings = []
+    for number, chunk in enumerate(chunks):
+        listings.append(Listing(
+            title if number == 0 else f"{title} - page {number + 1}",
+            dirs[number],
+            chunk,
+            newer=page_url(dirs[number - 1]) if number > 0 else None,
+            older=page_url(dirs[number + 1]) if number + 1 < len(chunks) else None,
+            by_year=by_year,
+        ))
+    return listings
+
+
+def build_listings(pages: list[Page], page_size: int = LISTING_PAGE_SIZE) -> list[Listing]:
+    # section indexes for top-level directories of posts without an index.md of their own,
+    # per-tag pages and a dated archive; listings never replace a page from content/
+    taken = {page.rel_path for page in pages}
+    sections = {}
+    for page in pages:
+        parts = page_rel_dir(page).split(os.sep)
+        if len(parts) >= 2:
+            sections.setdefault(parts[0], []).append(page)
+
+    listings = []
+    for section in sorted(sections):
+        listings.extend(paginate(section.capitalize(), section, newest_first(sections[section]), page_size))
+
+    tagged = {}
+    for page in pages:
+        for tag in page_tags(page):
+            tagged.setdefault(slugify(tag), (tag, []))[1].append(page)
+    for slug in sorted(tagged):
+        tag, tag_pages = tagged[slug]
+        listings.extend(paginate(f"Tagged {tag}", os.path.join(TAGS_DIR, slug), newest_first(tag_pages), page_size))
+
+    dated = [page for page in pages if page_date(page)]
+    if dated:
+        listings.extend(paginate("Archive", ARCHIVE_DIR, newest_first(dated), page_size, by_year=True))
+
+    return [listing for listing in listings if os.path.join(listing.rel_dir, "index.md") not in taken]
+
+
+def render_listings(listings: list[Listing], template_path: str, public_dir: str, basepath: str, template_hash: str, previous: dict = None) -> dict:
+    # writes only the listings whose signature changed or whose output went missing and returns
+    # the manifest entries, output path -> {"signature", "output"}
+    previous = previous or {}
+    entries = {}
+    template = load_template(template_path, basepath)
+    for listing in listings:
+        signature = listing.signature(template_hash, basepath)
+        dst_file = os.path.join(public_dir, listing.output)
+        entries[listing.output] = {"signature": signature, "output": listing.output}
+        if previous.get(listing.output, {}).get("signature") == signature and os.path.exists(dst_file):
+            continue
+        print(f"Generating listing {listing.output}")
+        os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+        context = {"Title": listing.title, "Content": content_fragments([listing.html()], basepath)}
+        write_output(dst_file, template.iter_render(context))
+    return entries
@@ -1,24 +1,87 @@
+import argparse
 import sys
 
-from FSoperations import copy_files, delete_files
-from generator import generate_pages
+from builder import BuildOptions, build_site
+from profiler import Profiler, enable_profiling
+from watcher import watch_site
 
 CONTENT_DIR = "./content"
 STATIC_DIR = "./static"
 PUBLIC_DIR = "./docs"
 TEMPLATE_PATH = "./template.html"
+CACHE_DIR = "./.ssg-cache"
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the static site into the public directory")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild pages and assets whose inputs changed since the last build")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="number of page rendering processes (default: one per CPU, 1 renders serially)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help=f"keep rendered blocks, page bodies and resized images here between builds (default: {CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="build without the on-disk caches")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="size limit of the on-disk page cache in MiB (default: 256)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="with --incremental, compare pages and static files by content hash instead of size and mtime")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="with --incremental, hardlink static files into the public directory when possible")
+    parser.add_argument("--copy-workers", type=int, default=None,
+                        help="number of threads copying static files (default: CPUs + 4, at most 32)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every build stage and page and print the slowest ones")
+    parser.add_argument("--profile-json", default=None, help="also write the profile to this JSON file")
+    parser.add_argument("--profile-pstats", default=None, help="also run the build under cProfile and dump pstats here")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="also write static files under content-hashed names and point pages at them")
+    parser.add_argument("--precompress", action="store_true",
+                        help="also write .gz (and .br when brotli is installed) copies of HTML, CSS and other text outputs")
+    parser.add_argument("--minify", action="store_true",
+                        help="collapse whitespace in generated HTML and static CSS, leaving <pre> and <code> content alone")
+    parser.add_argument("--drafts", action="store_true", help="also render pages marked draft in their front matter")
+    parser.add_argument("--watch", action="store_true",
+                        help="serve the public directory and re-render pages as their sources change")
+    parser.add_argument("--port", type=int, default=8888, help="port used by --watch (default: 8888)")
+    args = parser.parse_args(argv)
+    # re-rendered pages would point at stale fingerprints and compressed copies
+    if args.watch and (args.fingerprint or args.precompress):
+        parser.error("--fingerprint and --precompress cannot be combined with --watch")
+    return args
 
 
 def main():
-    
-    basepath = sys.argv[1] if len(sys.argv) >= 2 else "/"
+
+    args = parse_args(sys.argv[1:])
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    options = BuildOptions(incremental=args.incremental, jobs=args.jobs, cache_dir=cache_dir,
+                           cache_max_bytes=args.cache_size * 1024 * 1024, checksum=args.checksum,
+                           link_assets=args.link_assets, copy_workers=args.copy_workers, drafts=args.drafts,
+                           fingerprint=args.fingerprint, compress=args.precompress, minify=args.minify)
+
+    if args.watch:
+        watch_site(CONTENT_DIR, STATIC_DIR, PUBLIC_DIR, TEMPLATE_PATH, args.basepath, options, port=args.port)
+        return
+
+    profiler = None
+    if args.profile or args.profile_json or args.profile_pstats:
+        profiler = Profiler(pstats_path=args.profile_pstats)
+        enable_profiling(profiler)
+        profiler.start()
 
     try:
-        delete_files(PUBLIC_DIR)
-        copy_files(STATIC_DIR, PUBLIC_DIR)
-        generate_pages(CONTENT_DIR, TEMPLATE_PATH, PUBLIC_DIR, basepath)
+        build_site(CONTENT_DIR, STATIC_DIR, PUBLIC_DIR, TEMPLATE_PATH, args.basepath, options)
     except Exception as e:
         print(f"Error during site generation {e}")
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            enable_profiling(None)
+            print(profiler.report())
+            if args.profile_json:
+                profiler.dump_json(args.profile_json)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".ssg-manifest.json"
+MANIFEST_VERSION = 2
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest():
+    # pages:    content-relative source path -> {"hash", "parser", "size", "mtime", "template", "basepath", "images",
+    #                                            "image_urls", "output", "front_matter", "title", "failed" when it
+    #                                            failed to render}
+    # assets:   static-relative source path  -> {"size", "mtime", "output"}
+    # listings: public-relative output path  -> {"signature", "output"}
+    # images:   static-relative source path  -> {"size", "mtime", "hash", "width", "height", "variants"}
+    # compressed: public-relative output path -> {"size", "mtime", "hash", "outputs"}
+    def __init__(self, pages: dict = None, assets: dict = None, listings: dict = None, images: dict = None, compressed: dict = None):
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        self.listings = listings if listings is not None else {}
+        self.images = images if images is not None else {}
+        self.compressed = compressed if compressed is not None else {}
+
+    def outputs(self) -> set[str]:
+        outputs = set()
+        for entry in self.pages.values():
+            outputs.add(entry["output"])
+        for entry in self.assets.values():
+            outputs.add(entry["output"])
+            if "fingerprint" in entry:
+                outputs.add(entry["fingerprint"])
+        for entry in self.listings.values():
+            outputs.add(entry["output"])
+        for entry in self.images.values():
+            outputs.update(output for _, output in entry["variants"])
+        for entry in self.compressed.values():
+            outputs.update(entry["outputs"])
+        return outputs
+
+    @classmethod
+    def load(cls, path: str):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable build manifest {path} {e}")
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(data.get("pages", {}), data.get("assets", {}), data.get("listings", {}), data.get("images", {}), data.get("compressed", {}))
+
+    def save(self, path: str):
+        data = {
+            "version": MANIFEST_VERSION,
+            "pages": self.pages,
+            "assets": self.assets,
+            "listings": self.listings,
+            "images": self.images,
+            "compressed": self.compressed,
+        }
+        # written aside and renamed into place, so an interrupted save keeps the previous manifest
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+        except (OSError, IOError) as e:
+            print(f"Error writting build manifest {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def __eq__(self, other):
+        return self.pages == other.pages and self.assets == other.assets and self.listings == other.listings and self.images == other.images and self.compressed == other.compressed
+
+    def __repr__(self):
+        return f"Manifest({len(self.pages)} pages, {len(self.assets)} assets, {len(self.listings)} listings)"
@@ -0,0 +1,167 @@
+import re
+
+WHITESPACE_RE = re.compile(r"\s+")
+TAG_NAME_RE = re.compile(r"</?(!doctype|[a-z][a-z0-9-]*)", re.I)
+# whitespace next to these never renders, so it is dropped rather than collapsed to one space
+BLOCK_TAGS = {
+    "!doctype", "html", "head", "body", "title", "meta", "link", "script", "style", "base",
+    "article", "aside", "blockquote", "div", "footer", "header", "main", "nav", "section",
+    "figure", "figcaption", "form", "p", "pre", "hr", "br", "ul", "ol", "li", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tfoot", "tr", "th", "td", "h1", "h2", "h3", "h4", "h5", "h6",
+}
+# content of these elements is passed through untouched
+RAW_TAGS = {"pre", "code", "textarea", "script", "style"}
+RAW_END_RES = {tag: re.compile(rf"</{tag}\b", re.I) for tag in RAW_TAGS}
+RAW_END_LENGTH = max(len(tag) for tag in RAW_TAGS) + 2
+
+CSS_TOKEN_RE = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|\s+|[{};,>:()]|[^"\'/\s{};,>:()]+|/', re.S)
+# no space is needed after these characters, or before the ones in CSS_NO_SPACE_BEFORE
+CSS_NO_SPACE_AFTER = "{};,>:("
+CSS_NO_SPACE_BEFORE = "{};,>)"
+
+
+class HtmlMinifier():
+    # collapses whitespace between and around tags and drops comments; fed fragments in order,
+    # it holds back only an unfinished tag and the whitespace whose fate depends on what follows
+    def __init__(self):
+        self.buffer = ""
+        self.raw = None  # name of the raw element being passed through
+        self.space = False  # whitespace seen since the last emitted token
+        self.after_block = True  # the last emitted token was a block-level tag
+
+    def feed(self, text: str) -> str:
+        buffer = self.buffer + text
+        out = []
+        pos = 0
+        while pos < len(buffer):
+            if self.raw is not None:
+                match = RAW_END_RES[self.raw].search(buffer, pos)
+                if match is None:
+                    # the end of the buffer may be the start of the closing tag
+                    cut = max(pos, len(buffer) - RAW_END_LENGTH)
+                    out.append(buffer[pos:cut])
+                    pos = cut
+                    break
+                out.append(buffer[pos:match.start()])
+                pos = match.start()
+                self.raw = None
+                self.space = False
+                self.after_block = False
+            if buffer.startswith("<", pos):
+                if buffer.startswith("<!--", pos):
+                    end = buffer.find("-->", pos)
+                    if end == -1:
+                        break
+                    pos = end + 3
+                    continue
+                end = buffer.find(">", pos)
+                if end == -1:
+                    break
+                tag = buffer[pos:end + 1]
+                pos = end + 1
+                match = TAG_NAME_RE.match(tag)
+                name = match.group(1).lower() if match is not None else ""
+                self.emit(out, tag, name in BLOCK_TAGS)
+                if name in RAW_TAGS and not tag.startswith("</") and not tag.endswith("/>"):
+                    self.raw = name
+                continue
+            end = buffer.find("<", pos)
+            if end == -1:
+                end = len(buffer)
+            # text never needs holding back: only its surrounding whitespace does
+            text = WHITESPACE_RE.sub(" ", buffer[pos:end])
+            pos = end
+            if text.startswith(" "):
+                self.space = True
+            words = text.strip(" ")
+            if words:
+                self.emit(out, words, False)
+                self.space = text.endswith(" ")
+        self.buffer = buffer[pos:]
+        return "".join(out)
+
+    def emit(self, out: list, token: str, block: bool):
+        if self.space and not self.after_block and not block:
+            out.append(" ")
+        out.append(token)
+        self.space = False
+        self.after_block = block
+
+    def close(self) -> str:
+        # whatever is left is an unfinished tag or raw content, kept as written
+        out = []
+        if self.buffer:
+            self.emit(out, self.buffer, False)
+            self.buffer = ""
+        return "".join(out)
+
+
+class CssMinifier():
+    # drops comments and whitespace that separates nothing, and the last ";" of each block;
+    # strings are kept as written
+    def __init__(self):
+        self.buffer = ""
+        self.space = False
+        self.semicolon = False  # a ";" held back in case a "}" follows
+        self.last = ""  # last emitted character
+
+    def feed(self, text: str, final: bool = False) -> str:
+        buffer = self.buffer + text
+        out = []
+        pos = 0
+        while pos < len(buffer):
+            match = CSS_TOKEN_RE.match(buffer, pos)
+            if match is None or (buffer.startswith("/*", pos) and not match.group(0).endswith("*/")):
+                # an unfinished comment or string, kept as written if the input ends there
+                if final:
+                    self.emit(out, buffer[pos:])
+                    pos = len(buffer)
+                break
+            # a token reaching the end of the buffer may continue in the next fragment
+            if match.end() == len(buffer) and not final:
+                break
+            token = match.group(0)
+            pos = match.end()
+            if token.startswith("/*"):
+                continue
+            if token.isspace():
+                self.space = True
+            elif token == ";":
+                self.semicolon = True
+                self.space = False
+            else:
+                self.emit(out, token)
+        self.buffer = buffer[pos:]
+        return "".join(out)
+
+    def emit(self, out: list, token: str):
+        if self.semicolon:
+            self.semicolon = False
+            if token != "}":
+                out.append(";")
+                self.last = ";"
+        if self.space and self.last and self.last not in CSS_NO_SPACE_AFTER and token[0] not in CSS_NO_SPACE_BEFORE:
+            out.append(" ")
+        out.append(token)
+        self.space = False
+        self.last = token[-1]
+
+    def close(self) -> str:
+        rest = self.feed("", final=True)
+        if self.semicolon:
+            rest += ";"
+            self.semicolon = False
+        return rest
+
+
+MINIFIERS = {".html": HtmlMinifier, ".css": CssMinifier}
+
+
+def iter_minified(fragments, minifier):
+    for fragment in fragments:
+        text = minifier.feed(fragment)
+        if text:
+            yield text
+    text = minifier.close()
+    if text:
+        yield text
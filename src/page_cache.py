@@ -0,0 +1,121 @@
+import codecs
+import os
+import zlib
+
+from manifest import hash_bytes
+
+PAGE_CACHE_NAME = "pages"
+
+
+class CacheEntryError(Exception):
+    pass
+
+
+class PageCache():
+    # rendered page bodies on disk, one zlib-compressed file per source hash and parser version.
+    # Entries are written to a temporary file and renamed into place, so pool workers can read and
+    # fill the cache concurrently; eviction runs once per build from the main process
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024, version: str = ""):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, source_hash: str) -> str:
+        key = hash_bytes(f"{self.version}\0{source_hash}".encode())
+        return os.path.join(self.root, key[:2], f"{key}.z")
+
+    def lookup(self, source_hash: str):
+        path = self.path(source_hash)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        # a hit refreshes the mtime, which eviction uses as the last-used time
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def iter_entry(self, path: str, chunk_size: int = 1 << 16):
+        # streams a cached body back out without holding the whole page in memory; each chunk
+        # ends before its last "<" so no tag is split and fragments can be rewritten one by one
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    text = pending + decoder.decode(decompressor.decompress(chunk))
+                    cut = text.rfind("<")
+                    if cut == -1:
+                        cut = len(text)
+                    pending = text[cut:]
+                    if cut:
+                        yield text[:cut]
+            pending += decoder.decode(decompressor.flush(), final=True)
+            if not decompressor.eof:
+                raise zlib.error("truncated entry")
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            print(f"Dropping broken page cache entry {path} {e}")
+            remove_entry(path)
+            raise CacheEntryError(f"{path}: {e}") from e
+        if pending:
+            yield pending
+
+    def record(self, source_hash: str, fragments):
+        # passes fragments through while compressing them into a new entry, which only becomes
+        # visible once every fragment rendered
+        path = self.path(source_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        compressor = zlib.compressobj(6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(tmp_path, "wb") as f:
+                for fragment in fragments:
+                    f.write(compressor.compress(fragment.encode()))
+                    yield fragment
+                f.write(compressor.flush())
+            os.replace(tmp_path, path)
+        finally:
+            remove_entry(tmp_path)
+
+    def entries(self) -> list[tuple[int, int, str]]:
+        # (mtime_ns, size, path) for every entry
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".z"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def evict(self) -> int:
+        # drops least recently used entries until the cache fits in max_bytes
+        entries = sorted(self.entries())
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            remove_entry(path)
+            size -= entry_size
+            removed += 1
+        return removed
+
+    def __repr__(self):
+        return f"PageCache({self.root}, {self.hits} hits, {self.misses} misses)"
+
+
+def remove_entry(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,69 @@
+import os
+
+from FSoperations import scan_files
+from frontmatter import page_title, read_front_matter
+
+PAGE_SOURCE = "index.md"
+PAGE_OUTPUT = "index.html"
+
+
+class Page():
+    def __init__(self, content_dir: str, public_dir: str, rel_path: str, mtime: int, size: int, front_matter: dict = None, title: str = None):
+        rel_dir = os.path.dirname(rel_path)
+        self.rel_path = rel_path  # source path relative to content_dir, the manifest key
+        self.src_dir = os.path.join(content_dir, rel_dir) if rel_dir else content_dir
+        self.dst_dir = os.path.normpath(os.path.join(public_dir, rel_dir))
+        self.source = os.path.join(self.src_dir, PAGE_SOURCE)
+        self.output = os.path.join(self.dst_dir, PAGE_OUTPUT)
+        self.mtime = mtime
+        self.size = size
+        self.front_matter = front_matter if front_matter is not None else {}
+        self.title = title
+
+    @property
+    def draft(self) -> bool:
+        return self.front_matter.get("draft") is True
+
+    def dirs(self) -> tuple[str, str]:
+        return self.src_dir, self.dst_dir
+
+    def __repr__(self):
+        return f"Page({self.rel_path} -> {self.output})"
+
+
+def build_index(content_dir: str, public_dir: str, drafts: bool = False, cached: dict = None) -> list[Page]:
+    # one scandir walk over content_dir; every directory holding an index.md is one page, whatever
+    # else lives next to it, sorted so builds render and list pages in a stable order.
+    # Only the front matter and first body line of each source are read, never the whole body,
+    # and not even that when cached (manifest page entries) has the metadata for an unchanged file
+    cached = cached or {}
+    pages = {}
+    for rel_path, entry in scan_files(content_dir):
+        if entry.name != PAGE_SOURCE:
+            continue
+        stat = entry.stat()
+        known = cached.get(rel_path)
+        if known is not None and known.get("size") == stat.st_size and known.get("mtime") == stat.st_mtime_ns and "front_matter" in known:
+            front_matter, title = known["front_matter"], known.get("title")
+        else:
+            front_matter, title = load_front_matter(entry.path)
+        page = Page(content_dir, public_dir, rel_path, stat.st_mtime_ns, stat.st_size, front_matter, title)
+        if page.draft and not drafts:
+            continue
+        pages[rel_path] = page
+    return [pages[rel_path] for rel_path in sorted(pages, key=page_order)]
+
+
+def load_front_matter(path: str) -> tuple[dict, str]:
+    # a broken header is reported here and left for the page render to fail on
+    try:
+        front_matter, first_line = read_front_matter(path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading front matter {path} {e}")
+        return {}, None
+    return front_matter, page_title(front_matter, first_line)
+
+
+def page_order(rel_path: str) -> tuple:
+    # parents before their children, siblings alphabetically
+    return tuple(os.path.dirname(rel_path).split(os.sep)) if os.path.dirname(rel_path) else ()
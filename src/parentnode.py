@@ -1,19 +1,37 @@
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict = None):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # depth-first walk with an explicit stack, so each fragment is produced once
+        # instead of being re-wrapped by every enclosing level
+        yield self.open_tag()
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield f"</{node.tag}>"
+            elif isinstance(child, ParentNode):
+                yield child.open_tag()
+                stack.append((child, iter(child.children)))
+            else:
+                yield from child.iter_html()
+
+    def open_tag(self):
         if self.tag is None:
             raise ValueError("Tag cannot be None for ParentNode")
         if self.children is None:
             raise ValueError("ParentNode must have children")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>"
     
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.value}, {self.children})"
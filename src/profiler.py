@@ -0,0 +1,168 @@
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+NULL_STAGE = nullcontext()
+
+
+class StageStats():
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0  # largest growth of traced memory while the stage was running, in bytes
+        self.calls = 0
+
+    def to_dict(self) -> dict:
+        return {"wall": self.wall, "cpu": self.cpu, "peak": self.peak, "calls": self.calls}
+
+
+class Profiler():
+    # stage times are exclusive: while a nested stage runs, its parent's clocks are paused
+    def __init__(self, track_allocations: bool = True, pstats_path: str = None):
+        self.track_allocations = track_allocations
+        self.pstats_path = pstats_path
+        self.stages = {}
+        self.pages = {}
+        self.stack = []  # [name, wall start, cpu start, memory base]
+        self.started = (0.0, 0.0)
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.cprofile = None
+
+    def start(self):
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.pstats_path is not None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        self.wall = time.perf_counter() - self.started[0]
+        self.cpu = time.process_time() - self.started[1]
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.pstats_path)
+            self.cprofile = None
+        if self.track_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def memory(self) -> int:
+        if not self.track_allocations or not tracemalloc.is_tracing():
+            return 0
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+
+    def pause(self, frame: list):
+        stats = self.stages.setdefault(frame[0], StageStats())
+        stats.wall += time.perf_counter() - frame[1]
+        stats.cpu += time.process_time() - frame[2]
+        if self.track_allocations and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            stats.peak = max(stats.peak, peak - frame[3])
+
+    def resume(self, frame: list):
+        frame[1] = time.perf_counter()
+        frame[2] = time.process_time()
+        frame[3] = self.memory()
+
+    def enter(self, name: str):
+        if self.stack:
+            self.pause(self.stack[-1])
+        frame = [name, 0.0, 0.0, 0]
+        self.resume(frame)
+        self.stack.append(frame)
+
+    def exit(self):
+        frame = self.stack.pop()
+        self.pause(frame)
+        self.stages[frame[0]].calls += 1
+        if self.stack:
+            self.resume(self.stack[-1])
+
+    @contextmanager
+    def stage(self, name: str):
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def timed_iter(self, name: str, iterable):
+        # charges the time spent producing each item of a lazy iterable to a stage
+        iterator = iter(iterable)
+        while True:
+            self.enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+            yield item
+
+    @contextmanager
+    def page(self, name: str):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            stats = self.pages.setdefault(name, StageStats())
+            stats.wall += time.perf_counter() - wall
+            stats.cpu += time.process_time() - cpu
+            stats.calls += 1
+
+    def report(self, top: int = 10) -> str:
+        lines = [f"Build profile: {self.wall * 1000:.1f} ms wall, {self.cpu * 1000:.1f} ms cpu"]
+        lines.append(f"{'stage':24} {'wall ms':>10} {'cpu ms':>10} {'peak KiB':>10} {'calls':>8}")
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].wall):
+            lines.append(f"{name:24} {stats.wall * 1000:10.2f} {stats.cpu * 1000:10.2f} {stats.peak / 1024:10.1f} {stats.calls:8}")
+        if self.pages:
+            lines.append(f"Slowest {min(top, len(self.pages))} of {len(self.pages)} pages")
+            lines.append(f"{'page':48} {'wall ms':>10} {'cpu ms':>10}")
+            for name, stats in sorted(self.pages.items(), key=lambda item: -item[1].wall)[:top]:
+                lines.append(f"{name:48} {stats.wall * 1000:10.2f} {stats.cpu * 1000:10.2f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "pages": {name: stats.to_dict() for name, stats in self.pages.items()},
+        }
+
+    def dump_json(self, path: str):
+        try:
+            with open(path, "w") as f:
+                json.dump(self.to_dict(), f, indent=1)
+        except (OSError, IOError) as e:
+            print(f"Error writting profile {e}")
+            raise
+
+
+# the active profiler; the helpers below cost a single check when profiling is off
+PROFILER = None
+
+def enable_profiling(profiler: Profiler = None):
+    global PROFILER
+    PROFILER = profiler
+
+def stage(name: str):
+    if PROFILER is None:
+        return NULL_STAGE
+    return PROFILER.stage(name)
+
+def page(name: str):
+    if PROFILER is None:
+        return NULL_STAGE
+    return PROFILER.page(name)
+
+def timed_iter(name: str, iterable):
+    if PROFILER is None:
+        return iterable
+    return PROFILER.timed_iter(name, iterable)
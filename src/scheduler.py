@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import generator
+from generator import generate_page, use_block_cache, use_image_attributes, use_page_cache
+import template
+from template import use_asset_urls
+import writer
+from writer import record_written, take_written, use_deferred_sync, use_minify
+
+
+class BuildError(Exception):
+    def __init__(self, failures: dict[str, str]):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to render"]
+        for src_dir, error in failures.items():
+            lines.append(f"  {src_dir}: {error}")
+        super().__init__("\n".join(lines))
+
+
+def resolve_jobs(jobs: int = 0) -> int:
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def render_settings() -> dict:
+    # the module state a page render reads besides its arguments, as set in the main process
+    return {
+        "block_cache": generator.BLOCK_CACHE,
+        "page_cache": generator.PAGE_CACHE,
+        "image_attributes": generator.IMAGE_ATTRIBUTES,
+        "asset_urls": template.ASSET_URLS,
+        "minify": writer.MINIFY,
+        "deferred_sync": writer.DEFERRED_SYNC,
+    }
+
+
+def use_render_settings(settings: dict):
+    # pool initializer: workers get the render state handed over explicitly, so pages render the
+    # same whether the pool forks, spawns or uses a fork server
+    if settings["block_cache"] is not None:
+        settings["block_cache"].record_added()
+    use_block_cache(settings["block_cache"])
+    use_page_cache(settings["page_cache"])
+    use_image_attributes(settings["image_attributes"])
+    use_asset_urls(settings["asset_urls"])
+    use_minify(settings["minify"])
+    use_deferred_sync(settings["deferred_sync"])
+
+
+def render_page_task(src_dir: str, template_path: str, dst_dir: str, basepath: str):
+    # runs inside a worker process, so errors are reported back as text rather than raised;
+    # the files it wrote are reported back too, for the main process to sync, and so are the
+    # blocks it added to the worker's copy of the block cache, for the main process to keep
+    try:
+        generate_page(src_dir, template_path, dst_dir, basepath)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}", take_written(), take_blocks()
+    return None, take_written(), take_blocks()
+
+
+def take_blocks() -> list[tuple[str, str]]:
+    if generator.BLOCK_CACHE is None:
+        return []
+    return generator.BLOCK_CACHE.take_added()
+
+
+def render_pages(pages: list[tuple[str, str]], template_path: str, basepath: str, jobs: int = 0) -> dict[str, str]:
+    # renders every (source dir, output dir) pair and returns {source dir: error} for the ones that failed
+    jobs = resolve_jobs(jobs)
+    for src_dir, dst_dir in pages:
+        print(f"Generating page from {src_dir} to {dst_dir} using {template_path}")
+        os.makedirs(dst_dir, exist_ok=True)
+
+    if jobs == 1 or len(pages) < 2:
+        return render_serial(pages, template_path, basepath)
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pages)), initializer=use_render_settings,
+                                 initargs=(render_settings(),)) as pool:
+            results = list(pool.map(
+                render_page_task,
+                [src_dir for src_dir, _ in pages],
+                [template_path] * len(pages),
+                [dst_dir for _, dst_dir in pages],
+                [basepath] * len(pages),
+            ))
+    except (OSError, NotImplementedError, BrokenProcessPool) as e:
+        print(f"Process pool unavailable, rendering serially {e}")
+        return render_serial(pages, template_path, basepath)
+
+    failures = {}
+    for (src_dir, _), (error, written, blocks) in zip(pages, results):
+        record_written(written)
+        if generator.BLOCK_CACHE is not None:
+            for key, html in blocks:
+                generator.BLOCK_CACHE.store(key, html)
+        if error is not None:
+            failures[src_dir] = error
+    return failures
+
+
+def render_serial(pages: list[tuple[str, str]], template_path: str, basepath: str) -> dict[str, str]:
+    failures = {}
+    for src_dir, dst_dir in pages:
+        error, written, _ = render_page_task(src_dir, template_path, dst_dir, basepath)
+        record_written(written)
+        if error is not None:
+            failures[src_dir] = error
+    return failures
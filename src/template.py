@@ -0,0 +1,89 @@
+import json
+import os
+import re
+
+from manifest import hash_bytes
+
+SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+URL_ATTR_RE = re.compile(r'(href|src)="/([^"?#]*)([^"]*)"')
+# site URL of a static file -> its fingerprinted URL, set by the builder and handed to pool workers
+# by scheduler.use_render_settings; ASSET_URLS_HASH keys the template cache, since compiled
+# templates have the names baked in
+ASSET_URLS = {}
+ASSET_URLS_HASH = ""
+
+def use_asset_urls(urls: dict = None):
+    global ASSET_URLS, ASSET_URLS_HASH
+    ASSET_URLS = urls or {}
+    ASSET_URLS_HASH = hash_bytes(json.dumps(ASSET_URLS, sort_keys=True).encode()) if ASSET_URLS else ""
+
+
+class Template():
+    # segments alternate literal text and slot names: [literal, slot, literal, slot, ..., literal]
+    def __init__(self, source: str, basepath: str = "/"):
+        self.segments = []
+        pos = 0
+        for match in SLOT_RE.finditer(source):
+            self.segments.append(rebase_urls(source[pos:match.start()], basepath))
+            self.segments.append(match.group(1))
+            pos = match.end()
+        self.segments.append(rebase_urls(source[pos:], basepath))
+
+    def slots(self) -> list[str]:
+        return self.segments[1::2]
+
+    def iter_render(self, context: dict):
+        # slot values may be strings or iterables of fragments, which are streamed through as-is;
+        # unknown slots render empty
+        for idx, segment in enumerate(self.segments):
+            if idx % 2 == 0:
+                if segment:
+                    yield segment
+                continue
+            value = context.get(segment, "")
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def render(self, context: dict) -> str:
+        return "".join(self.iter_render(context))
+
+    def __repr__(self):
+        return f"Template({self.slots()})"
+
+
+# (template path, basepath, asset URLs hash) -> (mtime_ns, size, Template); each worker process
+# keeps its own copy
+TEMPLATE_CACHE = {}
+
+def load_template(path: str, basepath: str = "/") -> Template:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), basepath, ASSET_URLS_HASH)
+    cached = TEMPLATE_CACHE.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(path, "r") as template_file:
+        template = Template(template_file.read(), basepath)
+    TEMPLATE_CACHE[key] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
+
+
+def rewrites_urls(basepath: str) -> bool:
+    return basepath != "/" or bool(ASSET_URLS)
+
+
+def rebase_urls(html: str, basepath: str) -> str:
+    if not ASSET_URLS:
+        if basepath == "/":
+            return html
+        html = html.replace('href="/', f'href="{basepath}')
+        return html.replace('src="/', f'src="{basepath}')
+    # prefixing the basepath and swapping in fingerprinted names happen in the same single pass
+    return URL_ATTR_RE.sub(lambda match: rebase_url(match, basepath), html)
+
+
+def rebase_url(match: re.Match, basepath: str) -> str:
+    attr, path, suffix = match.groups()
+    path = ASSET_URLS.get(f"/{path}", f"/{path}")
+    return f'{attr}="{basepath}{path[1:]}{suffix}"'
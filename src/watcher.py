@@ -0,0 +1,230 @@
+import copy
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from block_cache import BlockCache
+from builder import MINIFIED_ASSET_EXTENSIONS, BuildOptions, build_site, page_images, template_key
+from FSoperations import copy_file, remove_files
+from frontmatter import read_front_matter
+from generator import generate_page, use_block_cache, use_image_attributes
+from images import IMAGE_EXTENSIONS, image_attributes, process_images
+from listings import build_listings, render_listings
+from manifest import MANIFEST_NAME, Manifest
+from MDtoHTML import PARSER_VERSION
+from page_index import build_index
+from writer import use_minify, write_output
+
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    # path -> (mtime_ns, size) for every file below the given files and directories
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, _, names in os.walk(path):
+            for name in names:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def diff_snapshots(old: dict, new: dict) -> tuple[list[str], list[str]]:
+    changed = [path for path, stat in new.items() if old.get(path) != stat]
+    removed = [path for path in old if path not in new]
+    return sorted(changed), sorted(removed)
+
+
+class SiteWatcher():
+    def __init__(self, content_dir: str, static_dir: str, public_dir: str, template_path: str, basepath: str,
+                 drafts: bool = False, minify: bool = False, cache_dir: str = None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.public_dir = public_dir
+        self.template_path = template_path
+        self.basepath = basepath
+        self.drafts = drafts
+        self.minify = minify
+        self.cache_dir = cache_dir
+        manifest = Manifest.load(os.path.join(public_dir, MANIFEST_NAME)) or Manifest()
+        self.listings = manifest.listings
+        self.images = manifest.images
+        self.files = snapshot(self.watched())
+        # source path -> site URLs of the images the page embeds, scanned for pages the manifest lacks
+        known = {os.path.join(content_dir, rel_path): entry["image_urls"] for rel_path, entry in manifest.pages.items()
+                 if "image_urls" in entry}
+        self.page_images = {path: known[path] if path in known else page_images(path)
+                            for path in self.files if self.is_page(path)}
+        self.referenced = self.referenced_images()
+
+    def watched(self) -> list[str]:
+        return [self.content_dir, self.static_dir, self.template_path]
+
+    def poll(self) -> bool:
+        files = snapshot(self.watched())
+        changed, removed = diff_snapshots(self.files, files)
+        self.files = files
+        if not changed and not removed:
+            return False
+        self.apply(changed, removed)
+        return True
+
+    def apply(self, changed: list[str], removed: list[str]):
+        pages = set()
+        if self.template_path in changed:
+            pages.update(path for path in self.files if self.is_page(path))
+
+        images = set()
+        for path in changed:
+            if self.is_page(path):
+                pages.add(path)
+                self.page_images[path] = page_images(path)
+            elif self.is_asset(path):
+                if self.is_image(path):
+                    images.add(self.asset_url(path))
+                dst_file = os.path.join(self.public_dir, os.path.relpath(path, self.static_dir))
+                os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+                if self.minify and path.endswith(MINIFIED_ASSET_EXTENSIONS):
+                    with open(path, "r") as src_file:
+                        write_output(dst_file, src_file)
+                    print(f"Minified {path}")
+                    continue
+                copy_file(path, dst_file)
+                print(f"Copied {path}")
+
+        pages_removed = False
+        for path in removed:
+            if self.is_page(path):
+                pages_removed = True
+                self.remove_page(path)
+                self.page_images.pop(path, None)
+                print(f"Removed page {path}")
+            elif self.is_asset(path):
+                if self.is_image(path):
+                    images.add(self.asset_url(path))
+                remove_files(self.public_dir, [os.path.relpath(path, self.static_dir)])
+                print(f"Removed {path}")
+
+        if images or pages or pages_removed:
+            self.update_images(images)
+            pages.update(path for path, urls in self.page_images.items() if images.intersection(urls))
+
+        for path in sorted(pages):
+            src_dir = os.path.dirname(path)
+            dst_dir = os.path.normpath(os.path.join(self.public_dir, os.path.relpath(src_dir, self.content_dir)))
+            started = time.perf_counter()
+            try:
+                if not self.drafts and self.is_draft(path):
+                    self.remove_page(path)
+                    print(f"Skipped draft {path}")
+                    continue
+                os.makedirs(dst_dir, exist_ok=True)
+                generate_page(src_dir, self.template_path, dst_dir, self.basepath)
+            except Exception as e:
+                print(f"Error generating page {path} {e}")
+                continue
+            print(f"Generated page {path} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        if pages or pages_removed:
+            self.update_listings()
+
+    def update_listings(self):
+        # listings are rewritten only when their entries changed, so body edits cost one page index walk
+        pages = build_index(self.content_dir, self.public_dir, self.drafts)
+        template_hash = template_key(self.template_path, {}, self.minify)
+        listings = render_listings(build_listings(pages), self.template_path, self.public_dir, self.basepath,
+                                   template_hash, self.listings)
+        remove_files(self.public_dir, set(self.listings) - set(listings))
+        self.listings = listings
+
+    def referenced_images(self) -> set[str]:
+        return {url[1:].replace("/", os.sep) for urls in self.page_images.values() for url in urls}
+
+    def update_images(self, changed: set[str]):
+        # re-measures changed images, resizes the ones pages embed and hands their attributes to
+        # the renderer; nothing is looked at while no image changed and pages embed the same ones
+        referenced = self.referenced_images()
+        if not changed and referenced == self.referenced:
+            return
+        self.referenced = referenced
+        images = process_images(self.static_dir, self.public_dir, self.cache_dir, self.images, jobs=1,
+                                referenced=referenced)
+        old_variants = {output for entry in self.images.values() for _, output in entry["variants"]}
+        new_variants = {output for entry in images.values() for _, output in entry["variants"]}
+        remove_files(self.public_dir, old_variants - new_variants)
+        self.images = images
+        use_image_attributes(image_attributes(images, self.basepath))
+
+    def remove_page(self, path: str):
+        rel_dir = os.path.relpath(os.path.dirname(path), self.content_dir)
+        remove_files(self.public_dir, [os.path.join(rel_dir, "index.html")])
+
+    def is_draft(self, path: str) -> bool:
+        front_matter, _ = read_front_matter(path)
+        return front_matter.get("draft") is True
+
+    def is_page(self, path: str) -> bool:
+        return os.path.basename(path) == "index.md" and is_below(path, self.content_dir)
+
+    def is_asset(self, path: str) -> bool:
+        return is_below(path, self.static_dir)
+
+    def is_image(self, path: str) -> bool:
+        return path.lower().endswith(IMAGE_EXTENSIONS)
+
+    def asset_url(self, path: str) -> str:
+        return "/" + os.path.relpath(path, self.static_dir).replace(os.sep, "/")
+
+    def run(self, interval: float = 0.05):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error during site regeneration {e}")
+            time.sleep(interval)
+
+
+def is_below(path: str, dir: str) -> bool:
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(dir)]) == os.path.abspath(dir)
+
+
+def serve(public_dir: str, port: int) -> ThreadingHTTPServer:
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=public_dir)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def watch_site(content_dir: str, static_dir: str, public_dir: str, template_path: str, basepath: str,
+               options: BuildOptions = None, port: int = 8888):
+    options = copy.copy(options) if options is not None else BuildOptions()
+    options.incremental = True
+    try:
+        build_site(content_dir, static_dir, public_dir, template_path, basepath, options)
+    except Exception as e:
+        print(f"Error during site generation {e}")
+    # the build turns minification back off when it returns
+    use_minify(options.minify)
+    # re-renders happen in this process, so keep parsed blocks warm between edits
+    use_block_cache(BlockCache(version=PARSER_VERSION))
+    watcher = SiteWatcher(content_dir, static_dir, public_dir, template_path, basepath, options.drafts, options.minify,
+                          options.cache_dir)
+    use_image_attributes(image_attributes(watcher.images, basepath))
+    server = serve(public_dir, port)
+    print(f"Serving {public_dir} on http://localhost:{port}/ and watching for changes")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
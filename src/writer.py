@@ -0,0 +1,98 @@
+import os
+
+from manifest import hash_file
+from minify import MINIFIERS, iter_minified
+
+# set by the builder and handed to pool workers by scheduler.use_render_settings
+MINIFY = False
+DEFERRED_SYNC = False
+# files replaced since deferred syncing was turned on, fsynced together by sync_written()
+WRITTEN = []
+
+def use_minify(enabled: bool = False):
+    global MINIFY
+    MINIFY = enabled
+
+def use_deferred_sync(enabled: bool = False):
+    global DEFERRED_SYNC
+    DEFERRED_SYNC = enabled
+    WRITTEN.clear()
+
+
+def write_output(path: str, fragments) -> bool:
+    # streams fragments into a temporary file next to path instead of joining the page in memory
+    # first, and renames it into place once complete, so readers never see a half-written file and
+    # a failure part-way leaves the previous version alone. Output identical to the existing file
+    # is dropped instead, keeping its mtime for downstream caches and sync tools; returns whether
+    # the file was replaced. With minification on, HTML and CSS are minified in the same pass
+    minifier = MINIFIERS.get(os.path.splitext(path)[1]) if MINIFY else None
+    if minifier is not None:
+        fragments = iter_minified(fragments, minifier())
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.writelines(fragments)
+        # hashes are only compared when the sizes already match
+        if same_size(tmp_path, path) and hash_file(tmp_path) == hash_file(path):
+            remove_partial(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+    except (OSError, IOError) as e:
+        print(f"Error writting HTML file {e}")
+        remove_partial(tmp_path)
+        raise
+    except Exception:
+        remove_partial(tmp_path)
+        raise
+    if DEFERRED_SYNC:
+        WRITTEN.append(path)
+    return True
+
+def same_size(path: str, other: str) -> bool:
+    try:
+        return os.stat(path).st_size == os.stat(other).st_size
+    except FileNotFoundError:
+        return False
+
+def remove_partial(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def take_written() -> list[str]:
+    # hands over (and forgets) the files this process wrote, so pool workers can report theirs
+    written = WRITTEN[:]
+    WRITTEN.clear()
+    return written
+
+def record_written(paths: list[str]):
+    if DEFERRED_SYNC:
+        WRITTEN.extend(paths)
+
+def sync_written() -> int:
+    # fsyncs every file written since deferred syncing was turned on, then their directories so
+    # the renames are durable too: one batch at the end of a build instead of a flush per file
+    paths = take_written()
+    dirs = set()
+    for path in paths:
+        try:
+            fsync_path(path)
+        except FileNotFoundError:
+            continue
+        dirs.add(os.path.dirname(path) or ".")
+    for dir in sorted(dirs):
+        try:
+            fsync_path(dir)
+        except OSError:
+            # directories cannot be opened for syncing everywhere (Windows)
+            pass
+    return len(paths)
+
+def fsync_path(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
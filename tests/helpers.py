@@ -0,0 +1,35 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+
+def png(width, height):
+    # just the signature and IHDR chunk, enough for the header-only size reader
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+
+
+class TempDirTestCase(unittest.TestCase):
+    # every test gets a fresh temporary directory, self.root; relative paths given to write and
+    # read are taken from there
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data, mtime=None):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def read(self, path):
+        with open(os.path.join(self.root, path), "r") as f:
+            return f.read()
@@ -0,0 +1,107 @@
+import os
+import unittest
+
+from FSoperations import CopyStats, copy_file, copy_files, is_synced, list_files, remove_files, sync_files
+from tests.helpers import TempDirTestCase
+
+
+class TestFSoperations(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dst = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png bytes")
+
+    def test_list_files(self):
+        self.assertEqual(list_files(self.src), [os.path.join("images", "a.png"), "index.css"])
+
+    def test_copy_file_keeps_mtime(self):
+        src_file = os.path.join(self.src, "index.css")
+        os.utime(src_file, (100, 100))
+        dst_file = os.path.join(self.root, "copy.css")
+        copy_file(src_file, dst_file)
+        self.assertEqual(self.read(dst_file), "body {}")
+        self.assertEqual(os.stat(dst_file).st_mtime, 100)
+        self.assertTrue(is_synced(src_file, dst_file))
+
+    def test_copy_file_link(self):
+        src_file = os.path.join(self.src, "index.css")
+        dst_file = os.path.join(self.root, "linked.css")
+        copy_file(src_file, dst_file, link=True)
+        self.assertEqual(self.read(dst_file), "body {}")
+        # a later plain copy must not write through the link into the source
+        self.write(os.path.join(self.root, "other.css"), "p {}")
+        copy_file(os.path.join(self.root, "other.css"), dst_file)
+        self.assertEqual(self.read(src_file), "body {}")
+        self.assertEqual(self.read(dst_file), "p {}")
+
+    def test_sync_copies_only_changes(self):
+        files, stats, removed = sync_files(self.src, self.dst)
+        self.assertEqual(stats.files, len(files))
+        self.assertEqual(removed, [])
+        _, stats, _ = sync_files(self.src, self.dst, files)
+        self.assertEqual(stats.files, 0)
+
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        _, stats, _ = sync_files(self.src, self.dst, files)
+        self.assertEqual((stats.files, stats.bytes), (1, 19))
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body { color: red }")
+
+    def test_sync_checksum_detects_same_size_edits(self):
+        files, _, _ = sync_files(self.src, self.dst)
+        src_file = os.path.join(self.src, "index.css")
+        self.write(src_file, "body []")
+        stat = os.stat(os.path.join(self.dst, "index.css"))
+        os.utime(src_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(sync_files(self.src, self.dst, files)[1].files, 0)
+        self.assertEqual(sync_files(self.src, self.dst, files, checksum=True)[1].files, 1)
+
+    def test_sync_removes_stale_files_only(self):
+        files, _, _ = sync_files(self.src, self.dst)
+        self.write(os.path.join(self.dst, "index.html"), "generated")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        _, _, removed = sync_files(self.src, self.dst, files)
+        self.assertEqual(removed, [os.path.join("images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.html")))
+
+    def test_sync_link(self):
+        sync_files(self.src, self.dst, link=True)
+        src_stat = os.stat(os.path.join(self.src, "index.css"))
+        dst_stat = os.stat(os.path.join(self.dst, "index.css"))
+        self.assertEqual(src_stat.st_ino, dst_stat.st_ino)
+        self.assertEqual(sync_files(self.src, self.dst, link=True)[1].files, 0)
+
+    def test_copy_files(self):
+        stats = copy_files(self.src, self.dst, workers=2)
+        self.assertEqual((stats.files, stats.bytes), (2, 16))
+        self.assertEqual(self.read(os.path.join(self.dst, "images", "a.png")), "png bytes")
+
+    def test_skipped_files_are_listed_but_not_copied(self):
+        stats = copy_files(self.src, self.dst, skip=(".css",))
+        self.assertEqual(stats.files, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "index.css")))
+        files, stats, _ = sync_files(self.src, self.dst, skip=(".css",))
+        self.assertIn("index.css", files)
+        self.assertEqual(stats.files, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "index.css")))
+
+    def test_copy_files_many_batches(self):
+        for i in range(300):
+            self.write(os.path.join(self.src, "many", f"{i}.txt"), str(i))
+        stats = copy_files(self.src, self.dst, workers=4)
+        self.assertEqual(stats.files, 302)
+        self.assertEqual(list_files(self.dst), list_files(self.src))
+        self.assertEqual(self.read(os.path.join(self.dst, "many", "299.txt")), "299")
+
+    def test_copy_stats_summary(self):
+        stats = CopyStats(files=2, bytes=2_000_000, seconds=0.5)
+        self.assertEqual(stats.throughput(), 4_000_000)
+        self.assertEqual(stats.summary(), "Copied 2 files (2.0 MB) in 0.50s (4.0 MB/s)")
+
+    def test_remove_files_missing(self):
+        remove_files(self.dst, ["missing.txt"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import os
 import unittest
-from MDtoHTML import markdown_to_html_node
+from block_cache import BlockCache
+from blocktype import BlockType
+from MDtoHTML import BLOCK_HANDLERS, BLOCK_NODE_HANDLERS, process_list_items, iter_markdown_html, markdown_to_html, markdown_to_html_node
 
 class TestMDtoHTML(unittest.TestCase):
     def test_paragraphs(self):
@@ -130,5 +133,66 @@ class TestMDtoHTML(unittest.TestCase):
             """<div><p>Here's the deal, <b>I like Tolkien</b>.</p><blockquote>"I am in fact a Hobbit in all but size." -- J.R.R. Tolkien</blockquote></div>"""
         )
 
+    def test_block_cache_matches_uncached(self):
+        md = """
+# Title
+
+Some **bold** text
+
+- one
+- two
+"""
+        cache = BlockCache()
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(cache.misses, 3)
+        edited = md.replace("two", "three")
+        self.assertEqual(markdown_to_html_node(edited, cache).to_html(), markdown_to_html_node(edited).to_html())
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_direct_renderer_matches_tree(self):
+        samples = [
+            "# Title\n\nPlain paragraph\nover lines",
+            "# One\n## Two\n### Three",
+            "> quote\n>\n> -- someone",
+            "> single line quote",
+            "- a **b**\n- [c](/d)\n- ![e](/f.png)",
+            "1. one\n2. _two_\n3. `three`",
+            "```\n    indented\n  code <b>\n```",
+            "Text with [a link](https://example.com/a_b) and `code_span`",
+            "",
+        ]
+        content_dir = os.path.join(os.path.dirname(__file__), "..", "content")
+        for root, _, files in os.walk(content_dir):
+            for name in files:
+                if name.endswith(".md"):
+                    with open(os.path.join(root, name)) as f:
+                        samples.append(f.read())
+        for md in samples:
+            expected = markdown_to_html_node(md).to_html()
+            self.assertEqual(markdown_to_html(md), expected)
+            self.assertEqual(markdown_to_html(md, BlockCache()), expected)
+
+    def test_code_block_with_blank_lines(self):
+        md = "```\nfirst\n\nsecond\n```"
+        expected = "<div><pre><code>first\n\nsecond\n</code></pre></div>"
+        self.assertEqual(markdown_to_html(md), expected)
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+
+    def test_every_block_type_has_handlers(self):
+        self.assertEqual(set(BLOCK_HANDLERS), set(BlockType))
+        self.assertEqual(set(BLOCK_NODE_HANDLERS), set(BlockType))
+
+    def test_process_list_items(self):
+        self.assertListEqual(process_list_items("- a\n-  b\n  - c"), ["a", "b", "c"])
+        self.assertListEqual(process_list_items("1. a\n2.  b"), ["a", "b"])
+        self.assertListEqual(process_list_items("plain"), [])
+
+    def test_iter_markdown_html_yields_blocks(self):
+        self.assertListEqual(
+            list(iter_markdown_html("# A\n\nb")),
+            ["<div>", "<h1>A</h1>", "<p>b</p>", "</div>"]
+        )
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_and_put(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("# Title"))
+        cache.put("# Title", "<h1>Title</h1>")
+        self.assertEqual(cache.get("# Title"), "<h1>Title</h1>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        cache.get("a")
+        cache.put("c", "12345")
+        self.assertEqual(cache.get("a"), "12345")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "12345")
+        self.assertEqual(cache.size, 10)
+
+    def test_oversized_fragment_is_not_cached(self):
+        cache = BlockCache(max_bytes=4)
+        cache.put("a", "12345")
+        self.assertEqual(len(cache), 0)
+
+    def test_version_changes_keys(self):
+        self.assertNotEqual(BlockCache(version="1").key("a"), BlockCache(version="2").key("a"))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "blocks.json")
+            cache = BlockCache(version="1")
+            cache.put("para", "<p>para</p>")
+            cache.save(path)
+
+            loaded = BlockCache(version="1")
+            loaded.load(path)
+            self.assertEqual(loaded.get("para"), "<p>para</p>")
+
+            stale = BlockCache(version="2")
+            stale.load(path)
+            self.assertEqual(len(stale), 0)
+
+if __name__ == "__main__":
+    unittest.main()
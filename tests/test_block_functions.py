@@ -1,5 +1,5 @@
 import unittest
-from block_functions import markdown_to_blocks, block_to_block_type
+from block_functions import markdown_to_blocks, block_to_block_type, iter_blocks
 from blocktype import BlockType
 
 class TestBlockFunctions(unittest.TestCase):
@@ -246,5 +246,53 @@ def hello():
         self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
         block = "paragraph"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_markdown_to_blocks_code_with_blank_lines(self):
+        md = """
+Intro
+```
+def a():
+    pass
+
+
+def b():
+    pass
+```
+Outro
+"""
+        self.assertEqual(
+            markdown_to_blocks(md),
+            [
+                "Intro",
+                "```\ndef a():\n    pass\n\n\ndef b():\n    pass\n```",
+                "Outro",
+            ],
+        )
+
+    def test_markdown_to_blocks_unclosed_fence(self):
+        md = "```\nnot code\n\nstill text"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["```\nnot code\nstill text"])
+        self.assertEqual(block_to_block_type(blocks[0]), BlockType.PARAGRAPH)
+
+    def test_iter_blocks_types(self):
+        lines = ["# Title\n", "\n", "- a\n", "- b\n", "\n", "```\n", "x\n", "\n", "y\n", "```\n", "> q\n"]
+        self.assertEqual(
+            list(iter_blocks(lines)),
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.UNORDERED_LIST, ["- a", "- b"]),
+                (BlockType.CODE, ["```", "x", "", "y", "```"]),
+                (BlockType.QUOTE, ["> q"]),
+            ],
+        )
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "first"
+            yield ""
+            raise AssertionError("read past the first block")
+        self.assertEqual(next(iter_blocks(lines())), (BlockType.PARAGRAPH, ["first"]))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
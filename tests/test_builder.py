@@ -0,0 +1,230 @@
+import os
+import unittest
+from unittest import mock
+
+from builder import BuildOptions, build_site
+from manifest import MANIFEST_NAME, Manifest
+from scheduler import BuildError
+from tests.helpers import TempDirTestCase, png
+
+TEMPLATE = "<html><title>{{ Title }}</title><link href=\"/index.css\"><body>{{ Content }}</body></html>"
+
+
+class TestBuilder(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.root
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nHello")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+    def build(self, basepath="/", incremental=True, fingerprint=False, compress=False, minify=False):
+        options = BuildOptions(incremental=incremental, fingerprint=fingerprint, compress=compress, minify=minify)
+        return build_site(self.content, self.static, self.public, self.template, basepath, options)
+
+    def test_first_incremental_build_is_full(self):
+        manifest = self.build()
+        self.assertEqual(set(manifest.pages), {"index.md", os.path.join("blog", "post", "index.md")})
+        self.assertIn("<h1>Post</h1>", self.read(os.path.join(self.public, "blog", "post", "index.html")))
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body {}")
+
+    def test_unchanged_pages_are_not_rewritten(self):
+        self.build()
+        post = os.path.join(self.public, "blog", "post", "index.html")
+        os.utime(post, (0, 0))
+        self.build()
+        self.assertEqual(os.stat(post).st_mtime, 0)
+
+    def test_changed_page_is_rerendered(self):
+        self.build()
+        home = os.path.join(self.public, "index.html")
+        post = os.path.join(self.public, "blog", "post", "index.html")
+        os.utime(post, (0, 0))
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        self.build()
+        self.assertIn("<p>Changed</p>", self.read(home))
+        self.assertEqual(os.stat(post).st_mtime, 0)
+
+    def test_touched_page_with_same_content_is_not_rerendered(self):
+        self.build()
+        post = os.path.join(self.public, "blog", "post", "index.html")
+        os.utime(post, (0, 0))
+        source = os.path.join(self.content, "blog", "post", "index.md")
+        os.utime(source, (1000, 1000))
+        manifest = self.build()
+        self.assertEqual(os.stat(post).st_mtime, 0)
+        self.assertEqual(manifest.pages[os.path.join("blog", "post", "index.md")]["mtime"], 1000 * 10**9)
+
+    def test_drafts_are_left_out(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "---\ndraft: true\n---\n# Post\n\nHello")
+        manifest = self.build()
+        self.assertNotIn(os.path.join("blog", "post", "index.md"), manifest.pages)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post", "index.html")))
+        manifest = build_site(self.content, self.static, self.public, self.template, "/",
+                              BuildOptions(incremental=True, drafts=True))
+        self.assertIn(os.path.join("blog", "post", "index.md"), manifest.pages)
+
+    def test_blog_listing_follows_membership(self):
+        self.build()
+        listing = os.path.join(self.public, "blog", "index.html")
+        self.assertIn('<a href="/blog/post">Post</a>', self.read(listing))
+        os.utime(listing, (0, 0))
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nEdited body")
+        self.build()
+        self.assertEqual(os.stat(listing).st_mtime, 0)
+        self.write(os.path.join(self.content, "blog", "next", "index.md"), "---\ndate: 2024-01-01\n---\n# Next")
+        manifest = self.build()
+        self.assertIn('<a href="/blog/next">Next</a> <time', self.read(listing))
+        self.assertIn(os.path.join("archive", "index.html"), manifest.listings)
+        os.remove(os.path.join(self.content, "blog", "next", "index.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "archive", "index.html")))
+
+    def test_image_change_rerenders_pages(self):
+        image = self.write(os.path.join(self.static, "images", "a.png"), png(16, 8))
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![a](/images/a.png)")
+        manifest = self.build()
+        home = os.path.join(self.public, "index.html")
+        self.assertIn('<img src="/images/a.png" width="16" height="8" alt="a"></img>', self.read(home))
+        self.assertEqual(manifest.pages["index.md"]["image_urls"], ["/images/a.png"])
+        # pages without the image are left alone
+        post = os.path.join(self.public, "blog", "post", "index.html")
+        self.write(post, "untouched")
+        self.write(image, png(32, 8))
+        self.build()
+        self.assertIn('width="32"', self.read(home))
+        self.assertEqual(self.read(post), "untouched")
+
+    def test_basepath_change_rerenders(self):
+        self.build()
+        self.build(basepath="/site/")
+        self.assertIn('href="/site/index.css"', self.read(os.path.join(self.public, "index.html")))
+
+    def test_orphans_are_removed(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_fingerprinted_assets(self):
+        manifest = self.build(basepath="/site/", fingerprint=True)
+        css = manifest.assets["index.css"]["fingerprint"]
+        self.assertRegex(css, r"^index\.[0-9a-f]{10}\.css$")
+        self.assertEqual(self.read(os.path.join(self.public, css)), "body {}")
+        self.assertIn(f'href="/site/{css}"', self.read(os.path.join(self.public, "index.html")))
+
+        # unchanged assets keep their name and pages are left alone
+        post = os.path.join(self.public, "blog", "post", "index.html")
+        os.utime(post, (0, 0))
+        self.assertEqual(self.build(basepath="/site/", fingerprint=True).assets["index.css"]["fingerprint"], css)
+        self.assertEqual(os.stat(post).st_mtime, 0)
+
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        changed = self.build(basepath="/site/", fingerprint=True).assets["index.css"]["fingerprint"]
+        self.assertNotEqual(changed, css)
+        self.assertFalse(os.path.exists(os.path.join(self.public, css)))
+        self.assertIn(f'href="/site/{changed}"', self.read(post))
+
+    def test_fingerprinting_can_be_turned_off(self):
+        css = self.build(fingerprint=True).assets["index.css"]["fingerprint"]
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, css)))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "asset-manifest.json")))
+        self.assertIn('href="/index.css"', self.read(os.path.join(self.public, "index.html")))
+
+    def test_precompressed_outputs_follow_their_pages(self):
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n" + "Hello " * 100)
+        self.build(compress=True)
+        compressed = os.path.join(self.public, "blog", "post", "index.html.gz")
+        self.assertTrue(os.path.exists(compressed))
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.build(compress=True)
+        self.assertFalse(os.path.exists(compressed))
+
+    def test_full_build_only_compresses_changed_files(self):
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n" + "Hello " * 100)
+        self.build(incremental=False, compress=True)
+        compressed = os.path.join(self.public, "blog", "post", "index.html.gz")
+        os.utime(compressed, (0, 0))
+        self.build(incremental=False, compress=True)
+        self.assertEqual(os.stat(compressed).st_mtime, 0)
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n" + "Changed " * 100)
+        self.build(incremental=False, compress=True)
+        self.assertNotEqual(os.stat(compressed).st_mtime, 0)
+
+    def test_minify(self):
+        self.write(self.template, "<html>\n  <body>\n    {{ Content }}\n  </body>\n</html>\n")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n```\ncode   stays\n  indented\n```")
+        self.write(os.path.join(self.static, "index.css"), "body {\n    color: red;\n}\n")
+        self.build(minify=True)
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")),
+                         "<html><body><div><h1>Home</h1><pre><code>code   stays\n  indented\n</code></pre></div></body></html>")
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body{color:red}")
+
+        # turning it off restores the verbatim outputs
+        self.build()
+        self.assertIn("\n  <body>", self.read(os.path.join(self.public, "index.html")))
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body {\n    color: red;\n}\n")
+
+    def test_missing_output_is_restored(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.css"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_full_build_keeps_identical_outputs(self):
+        self.build(incremental=False)
+        home = os.path.join(self.public, "index.html")
+        os.utime(home, (0, 0))
+        self.build(incremental=False)
+        self.assertEqual(os.stat(home).st_mtime, 0)
+
+    def test_full_build_prunes_what_it_did_not_write(self):
+        self.build(incremental=False)
+        stray = os.path.join(self.public, "old", "index.html")
+        self.write(stray, "stale")
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.build(incremental=False)
+        self.assertFalse(os.path.exists(stray))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "old")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_renderer_upgrade_rerenders(self):
+        self.build()
+        home = os.path.join(self.public, "index.html")
+        self.write(home, "stale")
+        with mock.patch("builder.PARSER_VERSION", "next"):
+            manifest = self.build()
+        self.assertIn("<h1>Home</h1>", self.read(home))
+        self.assertEqual(manifest.pages["index.md"]["parser"], "next")
+
+    def test_failed_page_is_retried_and_pruned(self):
+        self.build()
+        source = os.path.join(self.content, "blog", "post", "index.md")
+        self.write(source, "no title")
+        with self.assertRaises(BuildError):
+            self.build()
+        entry = Manifest.load(os.path.join(self.public, MANIFEST_NAME)).pages[os.path.join("blog", "post", "index.md")]
+        self.assertTrue(entry["failed"])
+        self.write(source, "# Fixed")
+        self.build()
+        self.assertIn("<h1>Fixed</h1>", self.read(os.path.join(self.public, "blog", "post", "index.html")))
+        self.write(source, "no title")
+        with self.assertRaises(BuildError):
+            self.build()
+        os.remove(source)
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post")))
+
+if __name__ == "__main__":
+    unittest.main()
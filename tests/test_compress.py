@@ -0,0 +1,51 @@
+import gzip
+import os
+import unittest
+
+from compress import MIN_COMPRESS_SIZE, compression_formats, precompress
+from tests.helpers import TempDirTestCase
+
+PAGE = "<html><body>" + "<p>Hello</p>" * 100 + "</body></html>"
+
+
+class TestCompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public = self.root
+        self.write("index.html", PAGE)
+        self.write("small.css", "body {}")
+        self.write("image.png", "x" * MIN_COMPRESS_SIZE)
+
+    def test_precompress(self):
+        entries = precompress(self.public, ["index.html", "small.css", "image.png"], jobs=1)
+        self.assertEqual(list(entries), ["index.html"])
+        self.assertEqual(entries["index.html"]["outputs"], ["index.html" + extension for extension in compression_formats()])
+        with gzip.open(os.path.join(self.public, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "small.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "image.png.gz")))
+
+    def test_unchanged_content_is_not_compressed_again(self):
+        previous = precompress(self.public, ["index.html"], jobs=1)
+        compressed = os.path.join(self.public, "index.html.gz")
+        os.utime(compressed, (0, 0))
+        # rewritten with the same content: hashed again, but not compressed again
+        self.write("index.html", PAGE)
+        entries = precompress(self.public, ["index.html"], previous, jobs=1)
+        self.assertEqual(entries["index.html"]["hash"], previous["index.html"]["hash"])
+        self.assertEqual(os.stat(compressed).st_mtime, 0)
+
+        self.write("index.html", PAGE + "<p>More</p>")
+        precompress(self.public, ["index.html"], entries, jobs=1)
+        with gzip.open(compressed, "rt") as f:
+            self.assertTrue(f.read().endswith("<p>More</p>"))
+
+    def test_missing_sibling_is_restored(self):
+        previous = precompress(self.public, ["index.html"], jobs=1)
+        os.remove(os.path.join(self.public, "index.html.gz"))
+        precompress(self.public, ["index.html"], previous, jobs=1)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
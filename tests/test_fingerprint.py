@@ -0,0 +1,55 @@
+import json
+import os
+import unittest
+
+from fingerprint import ASSET_MANIFEST_NAME, fingerprint_assets, fingerprinted_name
+from manifest import hash_bytes
+from tests.helpers import TempDirTestCase
+
+
+class TestFingerprint(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "docs")
+        for root in (self.static, self.public):
+            os.makedirs(os.path.join(root, "images"))
+            for rel_path, data in (("index.css", b"body {}"), (os.path.join("images", "a.png"), b"png")):
+                with open(os.path.join(root, rel_path), "wb") as f:
+                    f.write(data)
+
+    def entries(self):
+        entries = {}
+        for rel_path in ("index.css", os.path.join("images", "a.png")):
+            stat = os.stat(os.path.join(self.static, rel_path))
+            entries[rel_path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "output": rel_path}
+        return entries
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name(os.path.join("css", "site.min.css"), "0123456789abcdef"), os.path.join("css", "site.min.0123456789.css"))
+        self.assertEqual(fingerprinted_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_fingerprint_assets(self):
+        assets = self.entries()
+        urls = fingerprint_assets(self.public, assets)
+        css = fingerprinted_name("index.css", hash_bytes(b"body {}"))
+        self.assertEqual(assets["index.css"]["fingerprint"], css)
+        self.assertEqual(urls["/index.css"], f"/{css}")
+        self.assertEqual(urls["/images/a.png"], "/" + assets[os.path.join("images", "a.png")]["fingerprint"].replace(os.sep, "/"))
+        with open(os.path.join(self.public, css), "rb") as f:
+            self.assertEqual(f.read(), b"body {}")
+        with open(os.path.join(self.public, ASSET_MANIFEST_NAME)) as f:
+            self.assertEqual(json.load(f)["index.css"], css)
+
+    def test_unchanged_assets_are_not_hashed_again(self):
+        previous = self.entries()
+        for entry in previous.values():
+            entry["hash"] = "f" * 64
+        assets = self.entries()
+        fingerprint_assets(self.public, assets, previous)
+        self.assertEqual(assets["index.css"]["hash"], "f" * 64)
+        self.assertEqual(assets["index.css"]["fingerprint"], "index.ffffffffff.css")
+
+
+if __name__ == "__main__":
+    unittest.main()
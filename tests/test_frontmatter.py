@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import unittest
+
+from frontmatter import heading_title, page_title, parse_front_matter, read_front_matter, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_front_matter(self):
+        source = io.StringIO("---\ntitle: Hello: world\ndate: 2024-05-01\ndraft: true\nweight: 3\ntags: [a, \"b c\"]\n---\n\n# Body\n")
+        front_matter, body = split_front_matter(source)
+        self.assertDictEqual(front_matter, {
+            "title": "Hello: world",
+            "date": "2024-05-01",
+            "draft": True,
+            "weight": 3,
+            "tags": ["a", "b c"],
+        })
+        self.assertListEqual(list(body), ["# Body\n"])
+
+    def test_yaml_block_list(self):
+        front_matter = parse_front_matter(["tags:\n", "  - one\n", "  - two\n", "draft: no\n"])
+        self.assertDictEqual(front_matter, {"tags": ["one", "two"], "draft": False})
+
+    def test_toml_front_matter(self):
+        lines = ["+++\n", "# comment\n", "title = \"Hello\"\n", "tags = [\"x\"]\n", "+++\n", "text\n"]
+        front_matter, body = split_front_matter(lines)
+        self.assertDictEqual(front_matter, {"title": "Hello", "tags": ["x"]})
+        self.assertListEqual(list(body), ["text\n"])
+
+    def test_no_front_matter(self):
+        front_matter, body = split_front_matter(["# Title\n", "\n", "text\n"])
+        self.assertDictEqual(front_matter, {})
+        self.assertListEqual(list(body), ["# Title\n", "\n", "text\n"])
+
+    def test_empty_source(self):
+        front_matter, body = split_front_matter([])
+        self.assertDictEqual(front_matter, {})
+        self.assertListEqual(list(body), [""])
+
+    def test_unclosed_front_matter(self):
+        with self.assertRaises(ValueError):
+            split_front_matter(["---\n", "title: x\n"])
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["title = wrong separator\n"], ":")
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a key value pair\n"], ":")
+
+    def test_body_is_not_read(self):
+        def lines():
+            yield "---\n"
+            yield "title: Lazy\n"
+            yield "---\n"
+            yield "# Lazy\n"
+            raise AssertionError("read the body")
+        front_matter, body = split_front_matter(lines())
+        self.assertEqual(front_matter["title"], "Lazy")
+        self.assertEqual(next(body), "# Lazy\n")
+
+    def test_read_front_matter(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            with open(path, "w") as f:
+                f.write("---\ndraft: true\n---\n# Title\n\nbody\n")
+            self.assertEqual(read_front_matter(path), ({"draft": True}, "# Title\n"))
+
+    def test_titles(self):
+        self.assertEqual(heading_title("# Title\n"), "Title")
+        self.assertIsNone(heading_title("## Title"))
+        self.assertEqual(page_title({"title": 2024}, "# Heading"), "2024")
+        self.assertEqual(page_title({}, "# Heading"), "Heading")
+        self.assertIsNone(page_title({}, "text"))
+
+
+if __name__ == "__main__":
+    unittest.main()
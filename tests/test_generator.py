@@ -1,5 +1,10 @@
+import os
+import tempfile
+import tracemalloc
 import unittest
-from generator import extract_title
+from generator import content_fragments, extract_title, generate_page, use_image_attributes
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 class TestGenerator(unittest.TestCase):
     def test_extract_title(self):
@@ -27,5 +32,61 @@ class TestGenerator(unittest.TestCase):
         with self.assertRaises(ValueError):
             extract_title(markdown)
 
+    def test_content_fragments(self):
+        node = ParentNode("div", [LeafNode("a", "home", {"href": "/"}), LeafNode("img", "", {"src": "/a.png"})])
+        self.assertEqual(
+            "".join(content_fragments(node.iter_html(), "/site/")),
+            '<div><a href="/site/">home</a><img src="/site/a.png"></img></div>'
+        )
+        self.assertEqual("".join(content_fragments(node.iter_html(), "/")), node.to_html())
+
+    def test_content_fragments_adds_image_attributes(self):
+        use_image_attributes({"/a.png": ' width="4" height="2"'})
+        try:
+            fragments = ['<p><img src="/a.png" alt="a"></img>', '<img src="/b.png" alt="b"></img></p>']
+            self.assertEqual(
+                "".join(content_fragments(fragments, "/site/")),
+                '<p><img src="/site/a.png" width="4" height="2" alt="a"></img><img src="/site/b.png" alt="b"></img></p>'
+            )
+        finally:
+            use_image_attributes(None)
+
+    def test_generate_page_with_front_matter(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "index.md"), "w") as f:
+                f.write("---\ntitle: From front matter\ntags: [a]\n---\n\nNo heading here\n")
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            generate_page(tmp, template_path, tmp, "/")
+            with open(os.path.join(tmp, "index.html")) as f:
+                self.assertEqual(f.read(), "<title>From front matter</title><div><p>No heading here</p></div>")
+
+    def test_generate_page_streams_large_sources(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "index.md"), "w") as f:
+                f.write("# Big\n\n")
+                for idx in range(5000):
+                    f.write(f"Paragraph {idx} with **bold** and a [link](/x/{idx}).\n\n")
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title><body>{{ Content }}</body>")
+            source_size = os.path.getsize(os.path.join(tmp, "index.md"))
+
+            tracemalloc.start()
+            try:
+                generate_page(tmp, template_path, tmp, "/site/")
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            # memory follows the largest block, not the size of the page
+            self.assertLess(peak, source_size // 4)
+            with open(os.path.join(tmp, "index.html")) as f:
+                html = f.read()
+            self.assertTrue(html.startswith("<title>Big</title><body><div><h1>Big</h1><p>Paragraph 0 with <b>bold</b>"))
+            self.assertIn('<a href="/site/x/4999">link</a>', html)
+            self.assertTrue(html.endswith("</p></div></body>"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -33,5 +33,17 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node.props_to_html(), "")
             
 
+    def test_slots(self):
+        from leafnode import LeafNode
+        from parentnode import ParentNode
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
+    def test_tag_is_interned(self):
+        level = 2
+        self.assertIs(HTMLNode(f"h{level}").tag, HTMLNode("h" + str(level)).tag)
+
 if __name__ == "__main__":
     unittest.main()
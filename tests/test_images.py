@@ -0,0 +1,103 @@
+import os
+import struct
+import unittest
+
+from images import Image, image_attributes, image_size, process_images, variant_name
+from tests.helpers import TempDirTestCase, png
+
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+class TestImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        os.makedirs(self.public)
+
+    def write(self, rel_path, data):
+        return super().write(os.path.join(self.static, rel_path), data)
+
+    def test_image_size(self):
+        self.assertEqual(image_size(self.write("a.png", png(640, 480))), (640, 480))
+        self.assertEqual(image_size(self.write("a.gif", b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 8)), (32, 16))
+        self.assertEqual(image_size(self.write("a.jpg", jpeg(300, 200))), (300, 200))
+        self.assertIsNone(image_size(self.write("a.txt", b"not an image")))
+
+    def test_variant_name(self):
+        self.assertEqual(variant_name(os.path.join("images", "a.png"), 480), os.path.join("images", "a-480w.png"))
+
+    def test_image_attributes(self):
+        entries = {
+            os.path.join("images", "a.png"): {"width": 1200, "height": 600, "variants": [[480, os.path.join("images", "a-480w.png")]]},
+            os.path.join("images", "b.png"): {"width": 10, "height": 20, "variants": []},
+            os.path.join("images", "c.bin"): {"width": None, "height": None, "variants": []},
+        }
+        self.assertDictEqual(image_attributes(entries, "/site/"), {
+            "/images/a.png": ' width="1200" height="600" srcset="/site/images/a-480w.png 480w, /site/images/a.png 1200w"',
+            "/images/b.png": ' width="10" height="20"',
+        })
+
+    def test_process_images_measures_and_reuses_entries(self):
+        self.write(os.path.join("images", "a.png"), png(100, 50))
+        self.write("notes.txt", b"text")
+        entries = process_images(self.static, self.public)
+        rel_path = os.path.join("images", "a.png")
+        self.assertListEqual(list(entries), [rel_path])
+        self.assertEqual((entries[rel_path]["width"], entries[rel_path]["height"]), (100, 50))
+        # narrower than every variant width, so nothing to resize even with Pillow
+        self.assertListEqual(entries[rel_path]["variants"], [])
+
+        previous = {rel_path: dict(entries[rel_path], hash="kept")}
+        self.assertEqual(process_images(self.static, self.public, previous=previous)[rel_path]["hash"], "kept")
+        self.write(rel_path, png(200, 50))
+        entries = process_images(self.static, self.public, previous=previous)
+        self.assertNotEqual(entries[rel_path]["hash"], "kept")
+        self.assertEqual(entries[rel_path]["width"], 200)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_variants_are_cached(self):
+        rel_path = os.path.join("images", "big.png")
+        Image.new("RGB", (1000, 500)).save(os.path.join(self.static, rel_path))
+        cache = os.path.join(self.root, "cache")
+        entries = process_images(self.static, self.public, cache, jobs=1)
+        self.assertListEqual(entries[rel_path]["variants"], [[480, variant_name(rel_path, 480)], [960, variant_name(rel_path, 960)]])
+        variant = os.path.join(self.public, variant_name(rel_path, 480))
+        self.assertEqual(image_size(variant), (480, 240))
+        os.remove(variant)
+        process_images(self.static, self.public, cache, previous=entries, jobs=1)
+        self.assertTrue(os.path.exists(variant))
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_changed_image_replaces_its_variants(self):
+        rel_path = os.path.join("images", "big.png")
+        Image.new("RGB", (1000, 500)).save(os.path.join(self.static, rel_path))
+        entries = process_images(self.static, self.public, jobs=1)
+        variant = os.path.join(self.public, variant_name(rel_path, 480))
+        with open(variant, "rb") as f:
+            before = f.read()
+        Image.new("RGB", (1000, 500), "white").save(os.path.join(self.static, rel_path))
+        process_images(self.static, self.public, previous=entries, jobs=1)
+        with open(variant, "rb") as f:
+            self.assertNotEqual(f.read(), before)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_only_referenced_images_get_variants(self):
+        used = os.path.join("images", "used.png")
+        unused = os.path.join("images", "unused.png")
+        for rel_path in (used, unused):
+            Image.new("RGB", (1000, 500)).save(os.path.join(self.static, rel_path))
+        entries = process_images(self.static, self.public, jobs=1, referenced={used})
+        self.assertEqual(len(entries[used]["variants"]), 2)
+        self.assertListEqual(entries[unused]["variants"], [])
+        self.assertEqual(entries[unused]["width"], 1000)
+        self.assertFalse(os.path.exists(os.path.join(self.public, variant_name(unused, 480))))
+
+
+if __name__ == "__main__":
+    unittest.main()
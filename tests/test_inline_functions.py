@@ -1,6 +1,6 @@
 import unittest
 
-from inline_functions import text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
+from inline_functions import text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, text_to_html
 from textnode import TextNode, TextType
 
 class TestFunctions(unittest.TestCase):
@@ -368,6 +368,62 @@ class TestFunctions(unittest.TestCase):
             nodes
         )
 
+    def test_text_to_textnodes_space_between_links(self):
+        nodes = text_to_textnodes("[one](url1) [two](url2)")
+        self.assertListEqual(
+            [
+                TextNode("one", TextType.LINK, "url1"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("two", TextType.LINK, "url2"),
+            ],
+            nodes
+        )
+
+    def test_text_to_textnodes_underscores_in_urls(self):
+        nodes = text_to_textnodes("See [docs](https://example.com/some_long_path) and _this_")
+        self.assertListEqual(
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "https://example.com/some_long_path"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("this", TextType.ITALIC),
+            ],
+            nodes
+        )
+
+    def test_text_to_textnodes_code_is_literal(self):
+        nodes = text_to_textnodes("Call `snake_case(**kwargs)` now")
+        self.assertListEqual(
+            [
+                TextNode("Call ", TextType.TEXT),
+                TextNode("snake_case(**kwargs)", TextType.CODE),
+                TextNode(" now", TextType.TEXT),
+            ],
+            nodes
+        )
+
+    def test_text_to_textnodes_unmatched_brackets(self):
+        nodes = text_to_textnodes("[not a link] and ![nor](an image")
+        self.assertListEqual(
+            [TextNode("[not a link] and ![nor](an image", TextType.TEXT)],
+            nodes
+        )
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[l{i}](u{i})" for i in range(500))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 999)
+        self.assertEqual(nodes[-1], TextNode("l499", TextType.LINK, "u499"))
+
+    def test_text_to_textnodes_unclosed(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is **unclosed")
+
+    def test_text_to_html_matches_nodes(self):
+        text = "This is **text** with an _italic_ word and a `code block` and an ![image](/a.png) and a [link](https://boot.dev)"
+        expected = "".join(text_node_to_html_node(node).to_html() for node in text_to_textnodes(text))
+        self.assertEqual(text_to_html(text), expected)
+
     # def test_text_to_textnodes_nested(self):
     #     text = "This has **bold with _italic_ inside**"
     #     nodes = text_to_textnodes(text)
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from listings import build_listings, render_listings, slugify
+from page_index import Page
+
+
+def post(rel_dir, title, date=None, tags=None):
+    front_matter = {}
+    if date is not None:
+        front_matter["date"] = date
+    if tags is not None:
+        front_matter["tags"] = tags
+    return Page("content", "docs", os.path.join(rel_dir, "index.md"), 0, 0, front_matter, title)
+
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.pages = [
+            post("", "Home"),
+            post(os.path.join("blog", "a"), "A", "2023-05-01", ["Python", "web"]),
+            post(os.path.join("blog", "b"), "B", "2024-01-02", ["python"]),
+            post(os.path.join("blog", "c"), "C"),
+            post(os.path.join("blog", "d"), "D & more", "2024-03-04"),
+        ]
+
+    def by_dir(self, listings):
+        return {listing.rel_dir: listing for listing in listings}
+
+    def test_section_index_newest_first(self):
+        blog = self.by_dir(build_listings(self.pages))["blog"]
+        self.assertListEqual([title for title, _, _ in blog.entries], ["D & more", "B", "A", "C"])
+        self.assertEqual(blog.entries[1], ("B", "/blog/b", "2024-01-02"))
+        self.assertIn('<li><a href="/blog/d">D &amp; more</a> <time datetime="2024-03-04">2024-03-04</time></li>', blog.html())
+
+    def test_pagination(self):
+        listings = self.by_dir(build_listings(self.pages, page_size=3))
+        first = listings["blog"]
+        second = listings[os.path.join("blog", "page", "2")]
+        self.assertEqual(len(first.entries), 3)
+        self.assertEqual(first.older, "/blog/page/2")
+        self.assertIsNone(first.newer)
+        self.assertEqual(second.newer, "/blog")
+        self.assertIsNone(second.older)
+        self.assertEqual(second.title, "Blog - page 2")
+        self.assertIn('<nav><a href="/blog">Newer</a></nav>', second.html())
+
+    def test_tag_pages(self):
+        listings = self.by_dir(build_listings(self.pages))
+        python = listings[os.path.join("tags", "python")]
+        self.assertListEqual([title for title, _, _ in python.entries], ["B", "A"])
+        self.assertIn(os.path.join("tags", "web"), listings)
+
+    def test_archive_groups_by_year(self):
+        archive = self.by_dir(build_listings(self.pages))["archive"]
+        html = archive.html()
+        self.assertLess(html.index("<h2>2024</h2>"), html.index("<h2>2023</h2>"))
+        self.assertNotIn("/blog/c", html)
+
+    def test_content_pages_win(self):
+        pages = self.pages + [post("blog", "Hand written")]
+        self.assertNotIn("blog", self.by_dir(build_listings(pages)))
+
+    def test_no_listings_without_sections(self):
+        self.assertListEqual(build_listings([post("", "Home"), post("contact", "Contact")]), [])
+
+    def test_signature_ignores_bodies_but_not_order(self):
+        template_hash = "t"
+        before = self.by_dir(build_listings(self.pages))["blog"].signature(template_hash, "/")
+        self.pages[1].size = 100
+        self.assertEqual(self.by_dir(build_listings(self.pages))["blog"].signature(template_hash, "/"), before)
+        self.pages[1].front_matter["date"] = "2025-01-01"
+        self.assertNotEqual(self.by_dir(build_listings(self.pages))["blog"].signature(template_hash, "/"), before)
+
+    def test_slugify(self):
+        self.assertEqual(slugify("  Lord of the Rings! "), "lord-of-the-rings")
+
+    def test_render_skips_unchanged_listings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            public = os.path.join(tmp, "docs")
+            listings = build_listings(self.pages)
+            entries = render_listings(listings, template_path, public, "/site/", "t")
+            blog = os.path.join(public, "blog", "index.html")
+            with open(blog) as f:
+                self.assertIn('<a href="/site/blog/a">A</a>', f.read())
+            os.utime(blog, (0, 0))
+            self.assertEqual(render_listings(listings, template_path, public, "/site/", "t", entries), entries)
+            self.assertEqual(os.stat(blog).st_mtime, 0)
+            # a new signature renders the listing again, but identical output is not rewritten
+            render_listings(listings, template_path, public, "/site/", "changed", entries)
+            self.assertEqual(os.stat(blog).st_mtime, 0)
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }} - Blog</title>{{ Content }}")
+            render_listings(listings, template_path, public, "/site/", "changed again", entries)
+            self.assertNotEqual(os.stat(blog).st_mtime, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from manifest import Manifest, hash_bytes, hash_file
+
+
+class TestManifest(unittest.TestCase):
+    def test_hash_file_matches_hash_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.md")
+            with open(path, "wb") as f:
+                f.write(b"# Title\n")
+            self.assertEqual(hash_file(path), hash_bytes(b"# Title\n"))
+
+    def test_save_and_load_roundtrip(self):
+        manifest = Manifest(
+            {"index.md": {"hash": "a", "template": "b", "basepath": "/", "output": "index.html"}},
+            {"index.css": {"size": 7, "mtime": 0, "output": "index.css"}},
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            manifest.save(path)
+            self.assertEqual(Manifest.load(path), manifest)
+
+    def test_load_missing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(Manifest.load(os.path.join(tmp, "missing.json")))
+
+    def test_load_corrupt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            with open(path, "w") as f:
+                f.write("{not json")
+            self.assertIsNone(Manifest.load(path))
+
+    def test_outputs(self):
+        manifest = Manifest(
+            {"index.md": {"output": "index.html"}},
+            {"images/a.png": {"output": "images/a.png"}},
+        )
+        self.assertEqual(manifest.outputs(), {"index.html", "images/a.png"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from minify import CssMinifier, HtmlMinifier, iter_minified
+
+PAGE = """<!doctype html>
+<html>
+  <head>
+    <title>Page</title>
+  </head>
+  <body>
+    <!-- navigation -->
+    <p>Some   <b>bold</b>
+      text </p>
+    <pre><code>def f():
+    return  1 &lt; 2
+</code></pre>
+    <p>Inline <code>a   b</code> code</p>
+  </body>
+</html>
+"""
+
+STYLES = """/* site styles */
+body {
+    color: #fff;
+    font-family: "Open  Sans", serif;
+}
+
+@media screen and (max-width: 600px) {
+    .nav > li,
+    .nav a:hover {
+        margin: 0 auto;
+    }
+}
+"""
+
+
+def minify(fragments, minifier):
+    return "".join(iter_minified(fragments, minifier()))
+
+
+class TestMinify(unittest.TestCase):
+    def test_html(self):
+        self.assertEqual(
+            minify([PAGE], HtmlMinifier),
+            "<!doctype html><html><head><title>Page</title></head><body><p>Some <b>bold</b> text</p>"
+            "<pre><code>def f():\n    return  1 &lt; 2\n</code></pre><p>Inline <code>a   b</code> code</p></body></html>"
+        )
+
+    def test_html_keeps_inline_spacing(self):
+        self.assertEqual(minify(["<p>a <i>b</i>\n<i>c</i> d</p>"], HtmlMinifier), "<p>a <i>b</i> <i>c</i> d</p>")
+
+    def test_html_fragment_boundaries(self):
+        expected = minify([PAGE], HtmlMinifier)
+        for size in (1, 2, 5, 13):
+            fragments = [PAGE[start:start + size] for start in range(0, len(PAGE), size)]
+            self.assertEqual(minify(fragments, HtmlMinifier), expected)
+
+    def test_css(self):
+        self.assertEqual(
+            minify([STYLES], CssMinifier),
+            'body{color:#fff;font-family:"Open  Sans",serif}'
+            "@media screen and (max-width:600px){.nav>li,.nav a:hover{margin:0 auto}}"
+        )
+
+    def test_css_fragment_boundaries(self):
+        expected = minify([STYLES], CssMinifier)
+        for size in (1, 2, 5, 13):
+            fragments = [STYLES[start:start + size] for start in range(0, len(STYLES), size)]
+            self.assertEqual(minify(fragments, CssMinifier), expected)
+
+    def test_unfinished_input_is_kept(self):
+        self.assertEqual(minify(["<p>a</p> <b"], HtmlMinifier), "<p>a</p><b")
+        self.assertEqual(minify(["a{b:c} /* open"], CssMinifier), "a{b:c}/* open")
+
+
+if __name__ == "__main__":
+    unittest.main()
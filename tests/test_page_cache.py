@@ -0,0 +1,94 @@
+import os
+import unittest
+import zlib
+
+from generator import generate_page, use_page_cache
+from manifest import hash_file
+from page_cache import CacheEntryError, PageCache
+from tests.helpers import TempDirTestCase
+
+
+class TestPageCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = PageCache(os.path.join(self.root, "pages"), version="1")
+
+    def tearDown(self):
+        use_page_cache(None)
+        super().tearDown()
+
+    def fill(self, source_hash, fragments):
+        return list(self.cache.record(source_hash, fragments))
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.lookup("abc"))
+        self.assertListEqual(self.fill("abc", ["<div>", "<p>é</p>", "</div>"]), ["<div>", "<p>é</p>", "</div>"])
+        path = self.cache.lookup("abc")
+        self.assertEqual("".join(self.cache.iter_entry(path, chunk_size=3)), "<div><p>é</p></div>")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_version_changes_key(self):
+        self.fill("abc", ["x"])
+        self.assertIsNone(PageCache(self.cache.root, version="2").lookup("abc"))
+
+    def test_failed_render_leaves_no_entry(self):
+        def fragments():
+            yield "<div>"
+            raise ValueError("bad page")
+        with self.assertRaises(ValueError):
+            self.fill("abc", fragments())
+        self.assertIsNone(self.cache.lookup("abc"))
+        self.assertListEqual(os.listdir(os.path.dirname(self.cache.path("abc"))), [])
+
+    def test_broken_entry_is_dropped(self):
+        self.fill("abc", ["<p>body</p>"])
+        path = self.cache.path("abc")
+        with open(path, "wb") as f:
+            f.write(zlib.compress(b"<p>body</p>")[:-4])
+        with self.assertRaises(CacheEntryError):
+            list(self.cache.iter_entry(self.cache.lookup("abc")))
+        self.assertFalse(os.path.exists(path))
+
+    def test_evict_least_recently_used(self):
+        for idx, key in enumerate(["a", "b", "c"]):
+            self.fill(key, [os.urandom(64).hex()])
+            os.utime(self.cache.path(key), ns=(idx * 10**9, idx * 10**9))
+        self.cache.lookup("a")
+        self.cache.max_bytes = os.path.getsize(self.cache.path("a")) + os.path.getsize(self.cache.path("c"))
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertFalse(os.path.exists(self.cache.path("b")))
+        self.assertTrue(os.path.exists(self.cache.path("a")))
+
+    def test_generate_page_uses_cache(self):
+        page_dir = os.path.join(self.root, "page")
+        os.makedirs(page_dir)
+        source = os.path.join(page_dir, "index.md")
+        with open(source, "w") as f:
+            f.write("# Title\n\nBody")
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        use_page_cache(self.cache)
+
+        generate_page(page_dir, template, page_dir, "/")
+        path = self.cache.lookup(hash_file(source))
+        self.assertEqual("".join(self.cache.iter_entry(path)), "<div><h1>Title</h1><p>Body</p></div>")
+
+        # a hit streams the stored body instead of parsing the source again
+        self.fill(hash_file(source), ['<div><a href="/cached">cached</a></div>'])
+        generate_page(page_dir, template, page_dir, "/site/")
+        with open(os.path.join(page_dir, "index.html")) as f:
+            self.assertEqual(f.read(), '<title>Title</title><div><a href="/site/cached">cached</a></div>')
+
+        # a broken entry is dropped and the page rendered from its source instead
+        with open(self.cache.path(hash_file(source)), "wb") as f:
+            f.write(zlib.compress(b"<div>cached</div>")[:-4])
+        generate_page(page_dir, template, page_dir, "/")
+        with open(os.path.join(page_dir, "index.html")) as f:
+            self.assertEqual(f.read(), "<title>Title</title><div><h1>Title</h1><p>Body</p></div>")
+        path = self.cache.lookup(hash_file(source))
+        self.assertEqual("".join(self.cache.iter_entry(path)), "<div><h1>Title</h1><p>Body</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import unittest
+
+from page_index import build_index
+from tests.helpers import TempDirTestCase
+
+
+class TestPageIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        for rel_path in ["index.md", "blog/b/index.md", "blog/a/index.md", "blog/a/photo.png", "blog/a/notes.txt", "drafts/readme.md"]:
+            path = os.path.join(self.content, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("# Title\n")
+
+    def test_one_page_per_directory_with_index(self):
+        pages = build_index(self.content, "docs")
+        self.assertListEqual(
+            [page.rel_path for page in pages],
+            ["index.md", os.path.join("blog", "a", "index.md"), os.path.join("blog", "b", "index.md")]
+        )
+
+    def test_page_paths_and_stat(self):
+        page = build_index(self.content, "docs")[1]
+        source = os.path.join(self.content, "blog", "a", "index.md")
+        self.assertEqual(page.source, source)
+        self.assertEqual(page.dirs(), (os.path.join(self.content, "blog", "a"), os.path.join("docs", "blog", "a")))
+        self.assertEqual(page.output, os.path.join("docs", "blog", "a", "index.html"))
+        self.assertEqual(page.size, os.stat(source).st_size)
+        self.assertEqual(page.mtime, os.stat(source).st_mtime_ns)
+        self.assertEqual(page.front_matter, {})
+
+    def test_drafts_are_skipped(self):
+        with open(os.path.join(self.content, "blog", "b", "index.md"), "w") as f:
+            f.write("---\ntitle: Later\ndraft: true\n---\n# Later\n")
+        self.assertNotIn(os.path.join("blog", "b", "index.md"), [page.rel_path for page in build_index(self.content, "docs")])
+        page = build_index(self.content, "docs", drafts=True)[2]
+        self.assertTrue(page.draft)
+        self.assertEqual(page.title, "Later")
+
+    def test_title_from_heading(self):
+        self.assertEqual(build_index(self.content, "docs")[0].title, "Title")
+
+    def test_cached_front_matter_skips_unchanged_sources(self):
+        page = build_index(self.content, "docs")[1]
+        cached = {page.rel_path: {"size": page.size, "mtime": page.mtime, "front_matter": {"tags": ["x"]}, "title": "Cached"}}
+        page = build_index(self.content, "docs", cached=cached)[1]
+        self.assertEqual(page.title, "Cached")
+        self.assertEqual(page.front_matter, {"tags": ["x"]})
+        cached[page.rel_path]["size"] += 1
+        self.assertEqual(build_index(self.content, "docs", cached=cached)[1].title, "Title")
+
+    def test_root_page(self):
+        page = build_index(self.content, "docs/")[0]
+        self.assertEqual(page.dirs(), (self.content, "docs"))
+
+    def test_empty_content(self):
+        os.makedirs(os.path.join(self.root, "empty"))
+        self.assertListEqual(build_index(os.path.join(self.root, "empty"), "docs"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
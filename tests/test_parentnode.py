@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from parentnode import ParentNode
@@ -94,5 +95,32 @@ class TestParentNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_iter_html_fragments(self):
+        node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")], {"class": "x"})
+        self.assertListEqual(
+            list(node.iter_html()),
+            ['<p class="x">', "<b>bold</b>", " text", "</p>"]
+        )
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [LeafNode("i", "two")])])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(buffer.getvalue(), "<ul><li>one</li><li><i>two</i></li></ul>")
+
+    def test_to_html_very_deep_nesting(self):
+        node = LeafNode(None, "core")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 5000 + "core"))
+        self.assertTrue(html.endswith("</span>" * 5000))
+
+    def test_iter_html_none_children_nested(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import profiler
+from MDtoHTML import iter_markdown_html
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_nested_stages_are_exclusive(self):
+        prof = Profiler(track_allocations=False)
+        with prof.stage("outer"):
+            with prof.stage("inner"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(prof.stages["inner"].wall, 0.02)
+        self.assertLess(prof.stages["outer"].wall, 0.01)
+        self.assertEqual(prof.stages["outer"].calls, 1)
+
+    def test_timed_iter(self):
+        prof = Profiler(track_allocations=False)
+
+        def slow():
+            for idx in range(3):
+                time.sleep(0.005)
+                yield idx
+
+        self.assertEqual(list(prof.timed_iter("produce", slow())), [0, 1, 2])
+        self.assertEqual(prof.stages["produce"].calls, 4)
+        self.assertGreaterEqual(prof.stages["produce"].wall, 0.015)
+        self.assertEqual(prof.stack, [])
+
+    def test_allocations(self):
+        prof = Profiler()
+        prof.start()
+        with prof.stage("allocate"):
+            data = [bytearray(1024) for _ in range(100)]
+        prof.stop()
+        self.assertGreater(prof.stages["allocate"].peak, 100 * 1024)
+        del data
+
+    def test_pages_and_report(self):
+        prof = Profiler(track_allocations=False)
+        with prof.page("fast.md"):
+            pass
+        with prof.page("slow.md"):
+            with prof.stage("read"):
+                time.sleep(0.01)
+        report = prof.report(top=1)
+        self.assertIn("read", report)
+        self.assertIn("slow.md", report)
+        self.assertNotIn("fast.md", report)
+
+    def test_dump_json_and_pstats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pstats_path = os.path.join(tmp, "build.pstats")
+            prof = Profiler(pstats_path=pstats_path)
+            prof.start()
+            with prof.stage("work"):
+                sum(range(1000))
+            prof.stop()
+            self.assertTrue(os.path.exists(pstats_path))
+            json_path = os.path.join(tmp, "profile.json")
+            prof.dump_json(json_path)
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)["stages"]["work"]["calls"], 1)
+
+    def test_markdown_stages(self):
+        prof = Profiler(track_allocations=False)
+        profiler.enable_profiling(prof)
+        try:
+            "".join(iter_markdown_html(["# Title\n", "\n", "some text\n"]))
+        finally:
+            profiler.enable_profiling(None)
+        self.assertEqual(prof.stages["block typing"].calls, 2)
+        self.assertIn("block split", prof.stages)
+        self.assertIn("inline parse", prof.stages)
+
+    def test_disabled_helpers_are_passthrough(self):
+        profiler.enable_profiling(None)
+        items = [1, 2]
+        self.assertIs(profiler.timed_iter("x", items), items)
+        with profiler.stage("x"), profiler.page("y"):
+            pass
+
+if __name__ == "__main__":
+    unittest.main()
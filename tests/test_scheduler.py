@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import unittest
+
+from block_cache import BlockCache
+from generator import use_block_cache, use_image_attributes
+from scheduler import BuildError, render_pages, resolve_jobs
+from template import use_asset_urls
+from writer import take_written, use_deferred_sync, use_minify
+from tests.helpers import TempDirTestCase
+
+
+class TestScheduler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def page(self, name, markdown):
+        src_dir = os.path.dirname(self.write(os.path.join("content", name, "index.md"), markdown))
+        return src_dir, os.path.join(self.root, "docs", name)
+
+    def output(self, dst_dir):
+        return self.read(os.path.join(dst_dir, "index.html"))
+
+    def test_resolve_jobs(self):
+        self.assertEqual(resolve_jobs(3), 3)
+        self.assertGreaterEqual(resolve_jobs(0), 1)
+
+    def test_parallel_matches_serial(self):
+        pages = [self.page(f"p{i}", f"# Page {i}\n\nBody **{i}**") for i in range(4)]
+        self.assertEqual(render_pages(pages, self.template, "/", jobs=2), {})
+        parallel = [self.output(dst_dir) for _, dst_dir in pages]
+        self.assertEqual(render_pages(pages, self.template, "/", jobs=1), {})
+        serial = [self.output(dst_dir) for _, dst_dir in pages]
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial[2], "<title>Page 2</title><div><h1>Page 2</h1><p>Body <b>2</b></p></div>")
+
+    def test_spawned_workers_get_render_settings(self):
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>\n  {{ Content }}\n")
+        pages = [self.page(f"p{i}", f"# Page {i}\n\n![a](/a.png)") for i in range(2)]
+        method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method("spawn", force=True)
+        use_image_attributes({"/a.png": ' width="4" height="2"'})
+        use_asset_urls({"/a.png": "/a.0123456789.png"})
+        use_minify(True)
+        use_deferred_sync(True)
+        try:
+            self.assertEqual(render_pages(pages, self.template, "/", jobs=2), {})
+            written = take_written()
+        finally:
+            use_deferred_sync(False)
+            use_image_attributes(None)
+            use_asset_urls(None)
+            use_minify(False)
+            multiprocessing.set_start_method(method, force=True)
+        for _, dst_dir in pages:
+            html = self.output(dst_dir)
+            self.assertIn('<img src="/a.0123456789.png" width="4" height="2" alt="a">', html)
+            self.assertNotIn("\n", html)
+        self.assertEqual(sorted(written), [os.path.join(dst_dir, "index.html") for _, dst_dir in pages])
+
+    def test_blocks_rendered_in_workers_reach_the_cache(self):
+        pages = [self.page(f"p{i}", f"# Page {i}\n\nBody {i}") for i in range(2)]
+        cache = BlockCache()
+        use_block_cache(cache)
+        try:
+            self.assertEqual(render_pages(pages, self.template, "/", jobs=2), {})
+        finally:
+            use_block_cache(None)
+        self.assertEqual(cache.get("Body 1"), "<p>Body 1</p>")
+        self.assertEqual(len(cache), 4)
+
+    def test_errors_are_collected_per_page(self):
+        good = self.page("good", "# Good")
+        bad = self.page("bad", "## Not a title")
+        for jobs in (1, 2):
+            failures = render_pages([bad, good], self.template, "/", jobs=jobs)
+            self.assertEqual(list(failures), [bad[0]])
+            self.assertIn("ValueError", failures[bad[0]])
+            self.assertEqual(self.output(good[1]), "<title>Good</title><div><h1>Good</h1></div>")
+
+    def test_build_error_message(self):
+        error = BuildError({"content/bad": "ValueError: Wrong header level for a title"})
+        self.assertIn("1 page(s) failed", str(error))
+        self.assertIn("content/bad", str(error))
+
+if __name__ == "__main__":
+    unittest.main()
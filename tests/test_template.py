@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from template import TEMPLATE_CACHE, Template, load_template, rebase_urls, use_asset_urls
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertListEqual(
+            template.segments,
+            ["<title>", "Title", "</title><body>", "Content", "</body>"]
+        )
+        self.assertListEqual(template.slots(), ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(template.render({"Title": "Hi", "Content": "<p>x</p>"}), "<h1>Hi</h1><p>x</p>")
+
+    def test_render_streams_iterables(self):
+        template = Template("<body>{{ Content }}</body>")
+        fragments = iter(["<p>", "a", "</p>"])
+        self.assertListEqual(
+            list(template.iter_render({"Content": fragments})),
+            ["<body>", "<p>", "a", "</p>", "</body>"]
+        )
+
+    def test_missing_slot_renders_empty(self):
+        self.assertEqual(Template("a{{ Missing }}b").render({}), "ab")
+
+    def test_repeated_slot(self):
+        self.assertEqual(Template("{{ Title }}|{{ Title }}").render({"Title": "t"}), "t|t")
+
+    def test_basepath_only_rewrites_literals(self):
+        template = Template('<link href="/index.css">{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render({"Content": '<a href="/x">'}),
+            '<link href="/site/index.css"><a href="/x">'
+        )
+
+    def test_rebase_urls(self):
+        html = '<a href="/blog">x</a><img src="/a.png" alt="">'
+        self.assertEqual(rebase_urls(html, "/"), html)
+        self.assertEqual(
+            rebase_urls(html, "/site/"),
+            '<a href="/site/blog">x</a><img src="/site/a.png" alt="">'
+        )
+
+    def test_rebase_urls_with_asset_urls(self):
+        use_asset_urls({"/index.css": "/index.0123456789.css"})
+        try:
+            html = '<link href="/index.css?v=1"><a href="/blog">x</a>'
+            self.assertEqual(rebase_urls(html, "/"), '<link href="/index.0123456789.css?v=1"><a href="/blog">x</a>')
+            self.assertEqual(
+                Template(html, "/site/").render({}),
+                '<link href="/site/index.0123456789.css?v=1"><a href="/site/blog">x</a>'
+            )
+        finally:
+            use_asset_urls(None)
+
+    def test_load_template_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("one {{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            self.assertIsNot(load_template(path, "/site/"), first)
+
+            with open(path, "w") as f:
+                f.write("two, longer {{ Content }}")
+            os.utime(path, ns=(0, 0))
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render({"Content": "x"}), "two, longer x")
+            TEMPLATE_CACHE.clear()
+
+if __name__ == "__main__":
+    unittest.main()
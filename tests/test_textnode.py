@@ -25,5 +25,9 @@ class TestTextNode(unittest.TestCase):
         expected_repr = "TextNode(This is a text node, TextType.BOLD, http://example.com)"
         self.assertEqual(repr(node), expected_repr)
 
+    def test_slots(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
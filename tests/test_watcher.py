@@ -0,0 +1,124 @@
+import os
+import unittest
+import urllib.request
+
+from generator import use_image_attributes
+from watcher import SiteWatcher, diff_snapshots, serve, snapshot
+from writer import use_minify
+from tests.helpers import TempDirTestCase, png
+
+
+class TestWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.root
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        os.makedirs(self.public)
+        self.watcher = SiteWatcher(self.content, self.static, self.public, self.template, "/")
+
+    def output(self, *parts):
+        return os.path.join(self.public, *parts)
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1)}
+        new = {"a": (2, 1), "c": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["a", "c"], ["b"]))
+
+    def test_snapshot_includes_files_and_directories(self):
+        files = snapshot([self.content, self.template])
+        self.assertIn(self.template, files)
+        self.assertIn(os.path.join(self.content, "post", "index.md"), files)
+
+    def test_no_changes(self):
+        self.assertFalse(self.watcher.poll())
+
+    def test_only_changed_page_is_rendered(self):
+        self.write(os.path.join(self.content, "post", "index.md"), "# Edited post", mtime=1)
+        self.assertTrue(self.watcher.poll())
+        self.assertEqual(self.read(self.output("post", "index.html")), "<title>Edited post</title><div><h1>Edited post</h1></div>")
+        self.assertFalse(os.path.exists(self.output("index.html")))
+
+    def test_draft_page_is_not_rendered(self):
+        self.write(self.output("post", "index.html"), "old")
+        self.write(os.path.join(self.content, "post", "index.md"), "---\ndraft: true\n---\n# Post", mtime=1)
+        self.assertTrue(self.watcher.poll())
+        self.assertFalse(os.path.exists(self.output("post", "index.html")))
+
+    def test_new_post_updates_listing(self):
+        self.write(os.path.join(self.content, "blog", "first", "index.md"), "# First")
+        self.assertTrue(self.watcher.poll())
+        self.assertIn('<a href="/blog/first">First</a>', self.read(self.output("blog", "index.html")))
+        os.remove(os.path.join(self.content, "blog", "first", "index.md"))
+        self.assertTrue(self.watcher.poll())
+        self.assertFalse(os.path.exists(self.output("blog", "index.html")))
+
+    def test_template_change_renders_every_page(self):
+        self.write(self.template, "<h2>{{ Title }}</h2>", mtime=1)
+        self.watcher.poll()
+        self.assertEqual(self.read(self.output("index.html")), "<h2>Home</h2>")
+        self.assertEqual(self.read(self.output("post", "index.html")), "<h2>Post</h2>")
+
+    def test_assets_are_copied_and_removed(self):
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+        self.watcher.poll()
+        self.assertEqual(self.read(self.output("images", "a.png")), "png")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(self.output("images")))
+
+    def test_removed_page_output_is_deleted(self):
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post", mtime=1)
+        self.watcher.poll()
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(self.output("post")))
+
+    def test_render_errors_do_not_stop_watching(self):
+        self.write(os.path.join(self.content, "index.md"), "no title", mtime=1)
+        self.assertTrue(self.watcher.poll())
+        self.assertFalse(os.path.exists(self.output("index.html")))
+
+    def test_minified_pages_and_css(self):
+        watcher = SiteWatcher(self.content, self.static, self.public, self.template, "/", minify=True)
+        use_minify(True)
+        try:
+            self.write(os.path.join(self.content, "post", "index.md"), "# Edited\n\nsome   text", mtime=1)
+            self.write(os.path.join(self.static, "index.css"), "body {\n  color: red;\n}", mtime=1)
+            watcher.poll()
+        finally:
+            use_minify(False)
+        self.assertEqual(self.read(self.output("post", "index.html")), "<title>Edited</title><div><h1>Edited</h1><p>some text</p></div>")
+        self.assertEqual(self.read(self.output("index.css")), "body{color:red}")
+
+    def test_image_change_rerenders_pages_using_it(self):
+        image = self.write(os.path.join(self.static, "images", "a.png"), png(100, 50))
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\n![a](/images/a.png)")
+        watcher = SiteWatcher(self.content, self.static, self.public, self.template, "/")
+        try:
+            self.write(image, png(50, 25), mtime=1)
+            self.assertTrue(watcher.poll())
+            self.assertIn('<img src="/images/a.png" width="50" height="25" alt="a">', self.read(self.output("post", "index.html")))
+            self.assertFalse(os.path.exists(self.output("index.html")))
+        finally:
+            use_image_attributes(None)
+
+    def test_serve(self):
+        self.write(self.output("index.html"), "hello")
+        server = serve(self.public, 0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/index.html") as response:
+                self.assertEqual(response.read(), b"hello")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import unittest
+
+import writer
+from scheduler import render_pages
+from writer import sync_written, take_written, use_deferred_sync, write_output
+from tests.helpers import TempDirTestCase
+
+
+class TestWriter(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.html")
+
+    def tearDown(self):
+        use_deferred_sync(False)
+        super().tearDown()
+
+    def test_write_output(self):
+        self.assertTrue(write_output(self.path, iter(["<p>", "a", "</p>"])))
+        self.assertEqual(self.read(self.path), "<p>a</p>")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_identical_output_is_not_rewritten(self):
+        write_output(self.path, ["<p>a</p>"])
+        os.utime(self.path, (0, 0))
+        self.assertFalse(write_output(self.path, ["<p>", "a</p>"]))
+        self.assertEqual(os.stat(self.path).st_mtime, 0)
+        self.assertTrue(write_output(self.path, ["<p>b</p>"]))
+        self.assertEqual(self.read(self.path), "<p>b</p>")
+
+    def test_failure_keeps_previous_file(self):
+        write_output(self.path, ["<p>old</p>"])
+
+        def fragments():
+            yield "<p>new"
+            raise ValueError("broken page")
+
+        with self.assertRaises(ValueError):
+            write_output(self.path, fragments())
+        self.assertEqual(self.read(self.path), "<p>old</p>")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_deferred_sync(self):
+        write_output(self.path, ["a"])
+        self.assertEqual(writer.WRITTEN, [])
+        use_deferred_sync(True)
+        write_output(self.path, ["b"])
+        write_output(self.path, ["b"])
+        self.assertEqual(writer.WRITTEN, [self.path])
+        self.assertEqual(sync_written(), 1)
+        self.assertEqual(take_written(), [])
+
+    def test_pool_workers_report_written_files(self):
+        content = os.path.join(self.root, "content")
+        public = os.path.join(self.root, "docs")
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("{{ Content }}")
+        pages = []
+        for name in ("a", "b", "c"):
+            os.makedirs(os.path.join(content, name))
+            with open(os.path.join(content, name, "index.md"), "w") as f:
+                f.write(f"# {name}")
+            pages.append((os.path.join(content, name), os.path.join(public, name)))
+        use_deferred_sync(True)
+        self.assertEqual(render_pages(pages, template, "/", jobs=2), {})
+        self.assertEqual(sorted(take_written()), [os.path.join(public, name, "index.html") for name in ("a", "b", "c")])
+
+
+if __name__ == "__main__":
+    unittest.main()